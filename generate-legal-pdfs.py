@@ -4,11 +4,20 @@
 Bazary Legal Documents - Professional Law Firm Style PDF Generator
 Generates: Legal Review, Terms of Use, Privacy Policy
 """
-from fpdf import FPDF
+from pdfgen import halves, tables
+from pdfgen.base import BasePDF
 import os
 
 FONT = "/Library/Fonts/Arial Unicode.ttf"
+LATIN_FONT = "/System/Library/Fonts/Supplemental/Arial.ttf"  # FONT only fills its gaps
 BASE = os.path.dirname(__file__)
+OUT_REVIEW = os.path.join(BASE, "Bazary_Legal_Review_EN_FR.pdf")
+OUT_TERMS = os.path.join(BASE, "Bazary_Terms_of_Use_EN_FR.pdf")
+OUT_PRIVACY = os.path.join(BASE, "Bazary_Privacy_Policy_EN_FR.pdf")
+# Full text of the platform documents; the generators only add the cover
+MD_TERMS = os.path.join(BASE, "Bazary_Terms_of_Use_EN_FR.md")
+MD_PRIVACY = os.path.join(BASE, "Bazary_Privacy_Policy_EN_FR.md")
+LOCALES = ("en", "fr")  # the language sections of the MD_* sources, in order
 
 # Color palette - formal legal style
 NAVY = (26, 42, 74)       # Dark navy for headings
@@ -19,9 +28,14 @@ ACCENT = (26, 42, 74)     # Same navy for accent lines
 WHITE = (255, 255, 255)
 TBL_HDR = (42, 60, 90)    # Table header dark
 TBL_ALT = (245, 247, 250) # Table alt row
+TABLE_STYLE = tables.TableStyle(
+    header_font=("F", "B", 8.5), body_font=("F", "", 8.5),
+    header_fill=TBL_HDR, header_text=WHITE, header_border=TBL_HDR,
+    fills=(WHITE, TBL_ALT), body_text=BLACK, body_border=(200, 200, 200),
+    header_line=7, body_line=6.5)
 
 
-class LegalDoc(FPDF):
+class LegalDoc(BasePDF):
     """Professional legal document PDF."""
 
     def __init__(self, doc_ref, doc_title, confidential=False):
@@ -29,17 +43,22 @@ class LegalDoc(FPDF):
         self.doc_ref = doc_ref
         self.doc_title = doc_title
         self.confidential = confidential
-        self.add_font("F", "", FONT)
-        self.add_font("F", "B", FONT)
+        self.add_font_chain("F", [LATIN_FONT, FONT], styles=("", "B"))
         self.set_auto_page_break(auto=True, margin=28)
         self.set_left_margin(20)
         self.set_right_margin(20)
         self.alias_nb_pages()
         self.W = 170  # content width with margins
 
+    def continuation_args(self):
+        return self.doc_ref, self.doc_title, self.confidential
+
     def header(self):
         if self.page_no() == 1:
             return
+        self.static("header", self.header_static)
+
+    def header_static(self):
         # Thin top line
         self.set_draw_color(*NAVY)
         self.set_line_width(0.6)
@@ -58,6 +77,13 @@ class LegalDoc(FPDF):
         self.set_y(20)
 
     def footer(self):
+        self.static("footer", self.footer_static)
+        # Only the page number differs from page to page
+        self.set_font("F", "", 7)
+        self.set_text_color(*LIGHT)
+        self.cell(w=57, h=4, text=f"Page {self.page_no()} / {{nb}}", align="R")
+
+    def footer_static(self):
         self.set_y(-20)
         self.set_draw_color(*LIGHT)
         self.set_line_width(0.3)
@@ -67,7 +93,6 @@ class LegalDoc(FPDF):
         self.set_text_color(*LIGHT)
         self.cell(w=57, h=4, text=f"Ref: {self.doc_ref}", align="L")
         self.cell(w=56, h=4, text="www.bazary.mg", align="C")
-        self.cell(w=57, h=4, text=f"Page {self.page_no()} / {{nb}}", align="R")
 
     # --- Cover page ---
     def cover(self, title_lines, subtitle_lines, meta_lines):
@@ -124,6 +149,7 @@ class LegalDoc(FPDF):
         self.set_font("F", "B", 14)
         self.set_text_color(*NAVY)
         self.multi_cell(w=self.W, h=9, text=text.upper())
+        self.anchor("section_title", text)
         y = self.get_y() + 1
         self.set_draw_color(*NAVY)
         self.set_line_width(0.8)
@@ -140,6 +166,7 @@ class LegalDoc(FPDF):
         self.set_font("F", "B", 12)
         self.set_text_color(*NAVY)
         self.multi_cell(w=self.W, h=8, text=text)
+        self.anchor("part_title", text)
         self.ln(3)
 
     def article_title(self, text):
@@ -148,6 +175,7 @@ class LegalDoc(FPDF):
         self.set_font("F", "B", 10.5)
         self.set_text_color(*NAVY)
         self.multi_cell(w=self.W, h=7, text=text)
+        self.anchor("article_title", text)
         self.ln(2)
 
     def sub_heading(self, text):
@@ -220,30 +248,10 @@ class LegalDoc(FPDF):
         self.ln(6)
 
     def table(self, headers, rows, col_widths=None):
-        """Clean legal-style table"""
-        n = len(headers)
-        if not col_widths:
-            col_widths = [self.W / n] * n
-        # Header
-        self.set_font("F", "B", 8.5)
-        self.set_fill_color(*TBL_HDR)
-        self.set_text_color(*WHITE)
-        self.set_draw_color(*TBL_HDR)
-        for i, h in enumerate(headers):
-            self.cell(col_widths[i], 7, h, border=1, fill=True, align="C")
-        self.ln()
-        # Rows
-        self.set_font("F", "", 8.5)
-        self.set_draw_color(200, 200, 200)
-        for ri, row in enumerate(rows):
-            if ri % 2 == 1:
-                self.set_fill_color(*TBL_ALT)
-            else:
-                self.set_fill_color(*WHITE)
-            self.set_text_color(*BLACK)
-            for i, c in enumerate(row):
-                self.cell(col_widths[i], 6.5, c, border=1, fill=True, align="L")
-            self.ln()
+        """Clean legal-style table; `rows` may be any iterable (a generator is
+        laid out as it is read). Columns fit to their content unless col_widths
+        is given, long cells wrap, the header repeats on every page"""
+        tables.draw(self, headers, rows, TABLE_STYLE, self.W, col_widths)
         self.ln(3)
 
     def signature_block(self, place="Antananarivo", date="22 fevrier 2026"):
@@ -538,7 +546,6 @@ def gen_review():
     pdf.table(
         ["Protection Mechanism", "Legal Basis", "Strength"],
         [[p[0], p[1], p[2]] for p in protections],
-        col_widths=[90, 40, 40],
     )
 
     # VII. CONCLUSION
@@ -577,15 +584,16 @@ def gen_review():
         "Loi n\u00b02014-006 (edbm.mg) | Loi n\u00b02015-014 (faolex.fao.org) | CMIL (francophonie.org, clym.io)"
     )
 
-    out = os.path.join(BASE, "Bazary_Legal_Review_EN_FR.pdf")
+    out = OUT_REVIEW
     pdf.output(out)
     print(f"  [OK] {out}")
+    return out
 
 
 # ============================================================
 # 2. TERMS OF USE / CGU
 # ============================================================
-def gen_terms():
+def gen_terms(locale=None):
     pdf = LegalDoc("BZR-CGU-2026-001", "Terms of Use / CGU")
 
     pdf.cover(
@@ -604,284 +612,19 @@ def gen_terms():
         ],
     )
 
-    # ---- ENGLISH VERSION ----
-    pdf.section_title("English Version - Terms of Use")
-
-    articles_en = [
-        ("Article 1 \u2014 Preamble",
-         'These Terms of Use (hereinafter "TOU") govern the use of the Bazary platform (www.bazary.mg), an online classifieds service intended for residents of Madagascar. Use of the platform implies full and complete acceptance of these TOU.\n\nBazary is a platform connecting users who wish to sell and buy goods locally. Bazary is not a party to transactions and does not guarantee agreements between users.\n\nIn accordance with Law No. 2014-025 on electronic signatures, registration on the Platform and acceptance of these TOU by electronic means (account creation) have the same legal value as a handwritten signature.'),
-        ("Article 2 \u2014 Definitions",
-         None),
-        ("Article 3 \u2014 Purpose of the Service",
-         'Bazary provides a free platform allowing users to:\n\nIn accordance with Law No. 2014-024 on electronic transactions, Bazary acts exclusively as a host and technical intermediary. Bazary is neither a seller, nor a buyer, nor a party to any transaction between users. This intermediary status limits Bazary\'s liability in accordance with the applicable legal framework.'),
-        ("Article 4 \u2014 Registration and User Account",
-         'Access to the Service requires free registration. The User must provide accurate and truthful information.\n\nEach User is responsible for maintaining the confidentiality of their account. Any unauthorized use of the account shall not engage Bazary\'s liability.\n\nThe minimum age required to register is 18 years. The User certifies that they meet the legal age requirement upon registration.'),
-        ("Article 5 \u2014 Publication of Listings",
-         'Users may publish listings free of charge. Each listing must:\n\nBazary reserves the right to remove any listing that does not comply with these conditions without prior notice.'),
-        ("Article 6 \u2014 User Obligations", None),
-        ("Article 7 \u2014 Prohibited Content", None),
-        ("Article 8 \u2014 Transactions Between Users",
-         'Transactions are conducted directly between users. Bazary does not intervene in transactions and does not guarantee:\n\nAdvice: Prefer meetings in public and secure places and carefully verify the item before any purchase.'),
-        ("Article 9 \u2014 Intellectual Property",
-         'The Platform and all its content (logo, design, software) are the exclusive property of Bazary. Any unauthorized reproduction, extraction, or distribution is prohibited.\n\nBy publishing a listing, the User grants Bazary a non-exclusive license to use the images and content within the scope of the Service.'),
-        ("Article 10 \u2014 Limitation of Liability",
-         'Bazary makes every effort to ensure the availability of the Platform but cannot guarantee the absence of technical malfunctions.\n\nBazary shall not be held liable for:'),
-        ("Article 11 \u2014 Termination",
-         'The User may delete their account at any time. Bazary may suspend or delete an account for the following reasons:'),
-        ("Article 12 \u2014 Indemnification",
-         'The User agrees to indemnify and hold harmless Bazary, its directors, employees, and partners against any claim, loss, damage, or expense (including legal fees) resulting from:'),
-        ("Article 13 \u2014 Force Majeure",
-         'Bazary shall not be held liable for any delay or failure in the performance of its obligations resulting from force majeure events, including but not limited to:'),
-        ("Article 14 \u2014 Modification of TOU",
-         'Bazary reserves the right to modify these TOU at any time. Modifications shall take effect upon their publication on the Platform. Users will be informed of substantial modifications by notification on the Platform or by email. Continued use of the Platform after notification of modifications constitutes acceptance of the new TOU. In case of disagreement, the User may delete their account.'),
-        ("Article 15 \u2014 Legal References",
-         'These TOU are established in compliance with applicable Malagasy laws, notably Law No. 2014-024 on electronic transactions, Law No. 2014-006 on cybercrime, Law No. 2014-025 on electronic signatures, Law No. 2014-038 on the protection of personal data, and Law No. 2015-014 on consumer protection.'),
-        ("Article 16 \u2014 Applicable Law and Jurisdiction",
-         'These TOU are governed by Malagasy law. Any dispute relating to the use of the Platform shall first be submitted to an attempt at amicable resolution. Failing agreement, the competent courts of Antananarivo shall have sole jurisdiction.'),
-    ]
-
-    # Definitions bullets
-    defs_en = [
-        '"Platform": refers to the Bazary website and application.',
-        '"User": refers to any person registered on and using the Platform.',
-        '"Listing": refers to any offer of goods or services published by a User on the Platform.',
-        '"Service": refers to all functionalities offered by Bazary to Users.',
-    ]
-    # Art 3 bullets
-    a3_en = [
-        "Publish listings to sell new or used goods",
-        "Search for and browse listings",
-        "Communicate directly with sellers and buyers via messaging",
-        "Save listings to favorites",
-    ]
-    # Art 5 bullets
-    a5_en = [
-        "Clearly describe the goods or service offered",
-        "Contain authentic photos matching the goods (maximum 5 photos)",
-        "Indicate a clear price in Malagasy Ariary (MGA)",
-        "Specify the location (city and neighborhood) of the goods",
-        "Comply with the legislation in force in Madagascar",
-    ]
-    # Art 6 bullets
-    a6_en = [
-        "Not use the Platform for illegal purposes",
-        "Respect other users and their dignity",
-        'Not send unsolicited messages (spam) or post false listings',
-        "Not use multiple accounts for abusive purposes",
-        'Mark their listings as "Sold" once the transaction is completed',
-    ]
-    # Art 7 bullets
-    a7_en = [
-        "Drugs and illicit substances, alcohol (except within legal framework)",
-        "Weapons and ammunition",
-        "Stolen or illegally obtained goods",
-        "Counterfeits and unauthorized copies",
-        "Protected animals or derived products",
-        "Products dangerous to health (unauthorized medications, etc.)",
-        "Content inciting violence, discrimination, or contrary to good morals",
-        "Any goods contrary to Malagasy legislation",
-    ]
-    # Art 8 bullets
-    a8_en = [
-        "The quality of goods or the truthfulness of listings",
-        "The proper execution of transactions",
-        "Payment or refund",
-        "The accuracy of information provided by users",
-    ]
-    # Art 10 bullets
-    a10_en = [
-        "Failed transactions between users",
-        "Damages resulting from the use of the Platform",
-        "Content published by users",
-        "Service interruptions for technical reasons",
-    ]
-    # Art 11 bullets
-    a11_en = [
-        "Non-compliance with these TOU",
-        "Fraudulent or deceptive behavior",
-        "Repeated publication of non-compliant listings",
-        "Multiple reports from other users",
-    ]
-    # Art 12 bullets
-    a12_en = [
-        "Violation of these TOU by the User",
-        "Misuse of the Platform",
-        "Publication of illicit content or content infringing the rights of third parties",
-        "Any transaction conducted with other users",
-    ]
-    # Art 13 bullets
-    a13_en = [
-        "Natural disasters (cyclones, floods, earthquakes)",
-        "Power or telecommunications outages",
-        "Pandemics or epidemics",
-        "Civil unrest, wars, or acts of terrorism",
-        "Government or regulatory decisions",
-        "Any other unforeseeable, irresistible, and external event",
-    ]
-
-    bullet_map_en = {
-        1: defs_en, 2: a3_en, 4: a5_en, 5: a6_en, 6: a7_en,
-        7: a8_en, 9: a10_en, 10: a11_en, 11: a12_en, 12: a13_en,
-    }
-
-    for idx, (title, body_text) in enumerate(articles_en):
-        pdf.article_title(title)
-        if body_text:
-            # Split by double newline for paragraphs
-            for para in body_text.split('\n\n'):
-                if para.strip():
-                    pdf.body(para.strip())
-        if idx in bullet_map_en:
-            for b in bullet_map_en[idx]:
-                pdf.bullet(b)
-            pdf.ln(1)
-
-    pdf.separator()
-    pdf.sub_heading("Contact")
-    pdf.body("For any questions regarding these terms:")
-    pdf.body("Email: contact@bazary.mg | Telephone: +261 34 00 000 00 | Antananarivo, Madagascar")
-
-    # ---- FRENCH VERSION ----
-    pdf.section_title("Version Francaise - Conditions Generales d'Utilisation")
-
-    articles_fr = [
-        ("Article 1 \u2014 Preambule",
-         'Les presentes Conditions Generales d\'Utilisation (ci-apres "CGU") regissent l\'utilisation de la plateforme Bazary (www.bazary.mg), un service de petites annonces en ligne destine aux residents de Madagascar. L\'utilisation de la plateforme implique l\'acceptation pleine et entiere des presentes CGU.\n\nBazary est une plateforme de mise en relation entre utilisateurs souhaitant vendre et acheter des biens localement. Bazary n\'est pas partie prenante dans les transactions et ne garantit pas les accords entre utilisateurs.\n\nConformement a la Loi n\u00b02014-025 relative a la signature electronique, l\'inscription sur la Plateforme et l\'acceptation des presentes CGU par voie electronique (creation de compte) ont la meme valeur juridique qu\'une signature manuscrite.'),
-        ("Article 2 \u2014 Definitions", None),
-        ("Article 3 \u2014 Objet du service",
-         'Bazary fournit une plateforme gratuite permettant aux utilisateurs de :\n\nConformement a la Loi n\u00b02014-024 sur les transactions electroniques, Bazary agit exclusivement en qualite d\'hebergeur et d\'intermediaire technique. Bazary n\'est ni vendeur, ni acheteur, ni partie a quelque transaction que ce soit entre utilisateurs. Ce statut d\'intermediaire limite la responsabilite de Bazary conformement au cadre legal applicable.'),
-        ("Article 4 \u2014 Inscription et compte utilisateur",
-         'L\'acces au Service necessite une inscription gratuite. L\'Utilisateur doit fournir des informations exactes et conformes a la realite.\n\nChaque Utilisateur est responsable de la confidentialite de son compte. Toute utilisation non autorisee du compte ne saurait engager la responsabilite de Bazary.\n\nL\'age minimum requis pour s\'inscrire est de 18 ans. L\'Utilisateur certifie avoir l\'age legal requis lors de son inscription.'),
-        ("Article 5 \u2014 Publication d'annonces",
-         'L\'Utilisateur peut publier des annonces gratuitement. Chaque annonce doit :\n\nBazary se reserve le droit de supprimer toute annonce ne respectant pas ces conditions sans preavis.'),
-        ("Article 6 \u2014 Obligations des utilisateurs", None),
-        ("Article 7 \u2014 Contenus interdits", None),
-        ("Article 8 \u2014 Transactions entre utilisateurs",
-         'Les transactions sont effectuees directement entre utilisateurs. Bazary n\'intervient pas dans les transactions et ne garantit pas :\n\nConseil : Privilegiez les rencontres dans des lieux publics et securises et verifiez bien l\'article avant tout achat.'),
-        ("Article 9 \u2014 Propriete intellectuelle",
-         'La Plateforme et l\'ensemble de son contenu (logo, design, logiciels) sont la propriete exclusive de Bazary. Toute reproduction, extraction ou diffusion non autorisee est interdite.\n\nEn publiant une annonce, l\'Utilisateur accorde a Bazary une licence non exclusive d\'utilisation des images et contenus dans le cadre du Service.'),
-        ("Article 10 \u2014 Limitation de responsabilite",
-         'Bazary met tout en oeuvre pour assurer la disponibilite de la Plateforme, mais ne peut garantir l\'absence de dysfonctionnements techniques.\n\nBazary ne saurait etre tenu responsable :'),
-        ("Article 11 \u2014 Resiliation",
-         'L\'Utilisateur peut supprimer son compte a tout moment. Bazary peut suspendre ou supprimer un compte pour les motifs suivants :'),
-        ("Article 12 \u2014 Indemnisation",
-         'L\'Utilisateur s\'engage a indemniser et a degager de toute responsabilite Bazary, ses dirigeants, employes et partenaires, contre toute reclamation, perte, dommage ou depense (y compris les frais juridiques) resultant de :'),
-        ("Article 13 \u2014 Force majeure",
-         'Bazary ne saurait etre tenu responsable de tout retard ou manquement dans l\'execution de ses obligations resultant d\'evenements de force majeure, incluant notamment :'),
-        ("Article 14 \u2014 Modification des CGU",
-         'Bazary se reserve le droit de modifier les presentes CGU a tout moment. Les modifications prendront effet des leur publication sur la Plateforme. Les utilisateurs seront informes des modifications substantielles par notification sur la Plateforme ou par email. La poursuite de l\'utilisation de la Plateforme apres notification des modifications vaut acceptation des nouvelles CGU. En cas de desaccord, l\'Utilisateur peut supprimer son compte.'),
-        ("Article 15 \u2014 References legales",
-         'Les presentes CGU sont etablies en conformite avec les lois malgaches applicables, notamment la Loi n\u00b02014-024 sur les transactions electroniques, la Loi n\u00b02014-006 sur la cybercriminalite, la Loi n\u00b02014-025 sur la signature electronique, la Loi n\u00b02014-038 sur la protection des donnees personnelles, et la Loi n\u00b02015-014 sur la protection des consommateurs.'),
-        ("Article 16 \u2014 Droit applicable et juridiction competente",
-         'Les presentes CGU sont regies par le droit malgache. Tout litige relatif a l\'utilisation de la Plateforme sera d\'abord soumis a une tentative de resolution amiable. A defaut d\'accord, les tribunaux competents d\'Antananarivo seront seuls competents.'),
-    ]
-
-    defs_fr = [
-        '"Plateforme" : designe le site web et l\'application Bazary.',
-        '"Utilisateur" : designe toute personne inscrite et utilisant la Plateforme.',
-        '"Annonce" : designe toute offre de bien ou service publiee par un Utilisateur sur la Plateforme.',
-        '"Service" : designe l\'ensemble des fonctionnalites proposees par Bazary aux Utilisateurs.',
-    ]
-    a3_fr = [
-        "Publier des annonces pour vendre des biens neufs ou d'occasion",
-        "Rechercher et consulter des annonces",
-        "Communiquer directement avec les vendeurs et acheteurs via la messagerie",
-        "Sauvegarder des annonces en favoris",
-    ]
-    a5_fr = [
-        "Decrire clairement le bien ou service propose",
-        "Contenir des photos authentiques correspondant au bien (5 photos maximum)",
-        "Indiquer un prix clair en Ariary Malgache (MGA)",
-        "Preciser la localisation (ville et quartier) du bien",
-        "Etre conforme a la legislation en vigueur a Madagascar",
-    ]
-    a6_fr = [
-        "Ne pas utiliser la Plateforme a des fins illegales",
-        "Respecter les autres utilisateurs et leur dignite",
-        "Ne pas envoyer de messages non sollicites (spam) ou fausses annonces",
-        "Ne pas utiliser plusieurs comptes a des fins abusives",
-        'Marquer ses annonces comme "Vendu" une fois la transaction effectuee',
-    ]
-    a7_fr = [
-        "Drogues et substances illicites, alcool (sauf cadre legal)",
-        "Armes et munitions",
-        "Biens voles ou obtenus illegalement",
-        "Contrefacons et copies non autorisees",
-        "Animaux proteges ou produits derives",
-        "Produits dangereux pour la sante (medicaments non autorises, etc.)",
-        "Contenus incitant a la violence, a la discrimination ou contraires aux bonnes moeurs",
-        "Tout bien contraire a la legislation malgache",
-    ]
-    a8_fr = [
-        "La qualite des biens ou la veracite des annonces",
-        "La bonne execution des transactions",
-        "Le paiement ou le remboursement",
-        "L'exactitude des informations fournies par les utilisateurs",
-    ]
-    a10_fr = [
-        "Des transactions echouees entre utilisateurs",
-        "Des dommages resultant de l'utilisation de la Plateforme",
-        "Du contenu publie par les utilisateurs",
-        "Des interruptions de service pour raisons techniques",
-    ]
-    a11_fr = [
-        "Non-respect des presentes CGU",
-        "Comportement frauduleux ou trompeur",
-        "Publication repetee d'annonces non conformes",
-        "Signalements multiples de la part d'autres utilisateurs",
-    ]
-    a12_fr = [
-        "La violation des presentes CGU par l'Utilisateur",
-        "L'utilisation abusive de la Plateforme",
-        "La publication de contenus illicites ou portant atteinte aux droits de tiers",
-        "Toute transaction effectuee avec d'autres utilisateurs",
-    ]
-    a13_fr = [
-        "Catastrophes naturelles (cyclones, inondations, seismes)",
-        "Pannes d'electricite ou de telecommunications",
-        "Pandemies ou epidemies",
-        "Troubles civils, guerres ou actes de terrorisme",
-        "Decisions gouvernementales ou reglementaires",
-        "Tout autre evenement imprevisible, irresistible et exterieur",
-    ]
-
-    bullet_map_fr = {
-        1: defs_fr, 2: a3_fr, 4: a5_fr, 5: a6_fr, 6: a7_fr,
-        7: a8_fr, 9: a10_fr, 10: a11_fr, 11: a12_fr, 12: a13_fr,
-    }
-
-    for idx, (title, body_text) in enumerate(articles_fr):
-        pdf.article_title(title)
-        if body_text:
-            for para in body_text.split('\n\n'):
-                if para.strip():
-                    pdf.body(para.strip())
-        if idx in bullet_map_fr:
-            for b in bullet_map_fr[idx]:
-                pdf.bullet(b)
-            pdf.ln(1)
-
-    pdf.separator()
-    pdf.sub_heading("Nous contacter")
-    pdf.body("Pour toute question relative aux presentes conditions :")
-    pdf.body("Email : contact@bazary.mg | Telephone : +261 34 00 000 00 | Antananarivo, Madagascar")
-
+    halves.render(pdf, MD_TERMS, None if locale is None else LOCALES.index(locale))
     pdf.signature_block()
 
-    pdf.ln(6)
-    pdf.fine_print("Document version: 2026-02-22 | Ref: BZR-CGU-2026-001")
-    pdf.fine_print("This document is the official full-text extraction of the Terms of Use as displayed on the Bazary platform.")
-    pdf.fine_print("Ce document est l'extraction officielle en texte integral des Conditions Generales d'Utilisation telles qu'affichees sur la plateforme Bazary.")
-
-    out = os.path.join(BASE, "Bazary_Terms_of_Use_EN_FR.pdf")
+    out = OUT_TERMS
     pdf.output(out)
     print(f"  [OK] {out}")
+    return out
 
 
 # ============================================================
 # 3. PRIVACY POLICY / POLITIQUE DE CONFIDENTIALITE
 # ============================================================
-def gen_privacy():
+def gen_privacy(locale=None):
     pdf = LegalDoc("BZR-PDP-2026-001", "Privacy Policy / Politique de Confidentialite")
 
     pdf.cover(
@@ -904,344 +647,17 @@ def gen_privacy():
         ],
     )
 
-    # ---- ENGLISH ----
-    pdf.section_title("English Version - Privacy Policy")
-    pdf.body(
-        "The protection of your personal data is our priority. This policy explains how we collect, "
-        "store, and use your personal data when you use the Bazary platform."
-    )
-    pdf.legal_note(
-        "This policy is established in accordance with Law No. 2014-038 of January 9, 2015 on the "
-        "protection of personal data of Madagascar."
-    )
-
-    # Art 1
-    pdf.article_title("Article 1 \u2014 Data Controller")
-    pdf.body("Your personal data is collected and processed by:")
-    pdf.body("Bazary\nAntananarivo, Madagascar\nEmail: contact@bazary.mg\nTelephone: +261 34 00 000 00")
-    pdf.body(
-        "Competent supervisory authority: CMIL (Commission Malagasy de l'Informatique et des Libertes), "
-        "the independent authority responsible for the protection of personal data in Madagascar, "
-        "established by Article 28 of Law No. 2014-038."
-    )
-
-    # Art 2
-    pdf.article_title("Article 2 \u2014 Data Collected")
-    pdf.body("We collect the following categories of data:")
-    pdf.sub_heading("Identification data:")
-    for b in ["Full name", "Email address", "Phone number", "Profile photo (optional)"]:
-        pdf.bullet(b)
-    pdf.sub_heading("Location data:")
-    for b in ["City", "Neighborhood/District", "Approximate location (if authorized)"]:
-        pdf.bullet(b)
-    pdf.sub_heading("Listing data:")
-    for b in ["Titles and descriptions", "Item photos", "Prices", "Category and status"]:
-        pdf.bullet(b)
-    pdf.sub_heading("Communication data:")
-    for b in ["Messages exchanged via messaging", "Conversation history"]:
-        pdf.bullet(b)
-    pdf.sub_heading("Technical data:")
-    for b in ["IP address", "Browser type and device", "Pages visited and visit duration", "Cookies and session identifiers"]:
-        pdf.bullet(b)
-
-    # Art 3
-    pdf.article_title("Article 3 \u2014 Purposes of Collection and Legal Basis")
-    pdf.body("Your data is used for the following purposes:")
-    for b in [
-        "Account management: Creation and administration of your account",
-        "Listing publication: Allowing you to create and manage your listings",
-        "Messaging: Facilitating communication between users",
-        "Service improvement: Improving the experience and services offered",
-        "Security: Fighting fraud and protecting users",
-        "Communication: Sending notifications and useful information",
-    ]:
-        pdf.bullet(b)
-    pdf.ln(2)
-    pdf.legal_note(
-        "Legal basis for processing (Article 14, Law No. 2014-038): Your explicit consent upon registration; "
-        "the execution of the contract (TOU); our legal obligations; our legitimate interest (security and "
-        "service improvement)."
-    )
-    pdf.legal_note(
-        "Prior declaration: In accordance with Articles 43 and 45 of Law No. 2014-038, Bazary has made the "
-        "required prior declaration to the CMIL regarding personal data processing."
-    )
-
-    # Art 4
-    pdf.article_title("Article 4 \u2014 Data Sharing")
-    pdf.body("We do not sell or share your personal data with third parties, except in the following cases:")
-    for b in [
-        "Other users: Your name, city, and listings are visible to other users of the platform",
-        "Technical service providers: Partners necessary for the operation of the platform (hosting, email, etc.) bound by confidentiality agreements",
-        "Legal obligations: In case of requests from Malagasy authorities in accordance with the law",
-        "Protection of our rights: To protect the rights of Bazary and its users",
-    ]:
-        pdf.bullet(b)
-
-    # Art 5
-    pdf.article_title("Article 5 \u2014 Data Retention")
-    pdf.body("Your data is retained for the duration necessary for the purposes of their collection:")
-    pdf.table(
-        ["Data Type", "Retention Period"],
-        [
-            ["Account data", "Until account deletion by the user"],
-            ["Listings", "6 months after expiration"],
-            ["Messages", "12 months after the last interaction"],
-            ["Technical data", "12 months"],
-            ["Search data", "6 months"],
-        ],
-        col_widths=[70, 100],
-    )
-
-    # Art 6
-    pdf.article_title("Article 6 \u2014 Data Security")
-    pdf.body("We implement technical and organizational measures to protect your data against any unauthorized access, use, or destruction:")
-    for b in [
-        "SSL/TLS Encryption: All communications are encrypted",
-        "Secured passwords: Passwords are stored in hashed form",
-        "Firewall: Protection against cyber attacks",
-        "Monitoring: Continuous security monitoring",
-    ]:
-        pdf.bullet(b)
-    pdf.ln(2)
-    pdf.legal_note(
-        "Breach notification: In case of a personal data breach likely to pose a risk to your rights and freedoms, "
-        "Bazary commits to: notifying the CMIL as soon as possible; informing affected users if the breach presents "
-        "a high risk; taking all necessary measures to limit the consequences of the breach."
-    )
-
-    # Art 7
-    pdf.article_title("Article 7 \u2014 Your Rights")
-    pdf.body("In accordance with the legislation in force in Madagascar, you have the following rights:")
-    for b in [
-        "Right of access (Art. 23): Obtain a copy of your collected personal data",
-        "Right of rectification (Art. 25): Correct your inaccurate or incomplete data",
-        "Right of deletion: Request the erasure of your data",
-        "Right of opposition (Art. 22): Object to the processing of your data for legitimate reasons",
-        "Right of portability: Receive your data in an exploitable format",
-    ]:
-        pdf.bullet(b)
-    pdf.ln(2)
-    pdf.body("To exercise these rights, contact us at: contact@bazary.mg")
-    pdf.body("We will respond within 30 days.")
-    pdf.legal_note(
-        "Right of complaint: If you believe that the processing of your data is not compliant with Law No. 2014-038, "
-        "you have the right to file a complaint with the CMIL (Commission Malagasy de l'Informatique et des Libertes)."
-    )
-
-    # Art 8
-    pdf.article_title("Article 8 \u2014 Cookies")
-    pdf.body("Bazary uses cookies to improve your experience. Cookies are small files stored in your browser.")
-    pdf.table(
-        ["Type", "Purpose", "Duration"],
-        [
-            ["Essential", "Platform operation (session, language)", "Session"],
-            ["Functional", "Memorization of your preferences", "12 months"],
-            ["Analytical", "Understanding platform usage", "12 months"],
-        ],
-        col_widths=[40, 85, 45],
-    )
-    pdf.body("You can manage cookies by modifying your browser settings.")
-
-    # Art 9
-    pdf.article_title("Article 9 \u2014 International Transfers")
-    pdf.body(
-        "Your data may be stored on servers located outside of Madagascar (particularly for hosting). "
-        "In accordance with Article 20 of Law No. 2014-038, such transfers are only carried out if the "
-        "recipient country ensures an adequate level of protection, or under appropriate safeguards "
-        "(contractual clauses, CMIL authorization, or your explicit consent)."
-    )
-
-    # Art 10
-    pdf.article_title("Article 10 \u2014 Policy Modifications")
-    pdf.body(
-        "We may modify this policy at any time. Any modification will be communicated via a notification "
-        "on the platform. Continued use of the Platform after modification constitutes acceptance of the new policy."
-    )
-
-    pdf.separator()
-    pdf.sub_heading("Contact \u2014 Data Protection Officer (DPO)")
-    pdf.body("For any questions regarding your personal data:")
-    pdf.body("DPO Email: dpo@bazary.mg | General: contact@bazary.mg | Antananarivo, Madagascar")
-
-    # ---- FRENCH ----
-    pdf.section_title("Version Francaise - Politique de Confidentialite")
-    pdf.body(
-        "La protection de vos donnees personnelles est notre priorite. Cette politique explique comment nous "
-        "collectons, stockons et utilisons vos donnees personnelles lorsque vous utilisez la plateforme Bazary."
-    )
-    pdf.legal_note(
-        "Cette politique est etablie conformement a la Loi n\u00b02014-038 du 9 janvier 2015 relative a la "
-        "protection des donnees a caractere personnel de Madagascar."
-    )
-
-    # Art 1 FR
-    pdf.article_title("Article 1 \u2014 Responsable du traitement")
-    pdf.body("Vos donnees personnelles sont collectees et traitees par :")
-    pdf.body("Bazary\nAntananarivo, Madagascar\nEmail : contact@bazary.mg\nTelephone : +261 34 00 000 00")
-    pdf.body(
-        "Autorite de controle competente : CMIL (Commission Malagasy de l'Informatique et des Libertes), "
-        "l'autorite independante chargee de la protection des donnees a caractere personnel a Madagascar, "
-        "instituee par l'Article 28 de la Loi n\u00b02014-038."
-    )
-
-    # Art 2 FR
-    pdf.article_title("Article 2 \u2014 Donnees collectees")
-    pdf.body("Nous collectons les categories de donnees suivantes :")
-    pdf.sub_heading("Donnees d'identification :")
-    for b in ["Nom complet", "Adresse email", "Numero de telephone", "Photo de profil (optionnel)"]:
-        pdf.bullet(b)
-    pdf.sub_heading("Donnees de localisation :")
-    for b in ["Ville", "Quartier/District", "Localisation approximative (si autorisee)"]:
-        pdf.bullet(b)
-    pdf.sub_heading("Donnees d'annonces :")
-    for b in ["Titres et descriptions", "Photos des articles", "Prix", "Categorie et statut"]:
-        pdf.bullet(b)
-    pdf.sub_heading("Donnees de communication :")
-    for b in ["Messages echanges via la messagerie", "Historique des conversations"]:
-        pdf.bullet(b)
-    pdf.sub_heading("Donnees techniques :")
-    for b in ["Adresse IP", "Type de navigateur et appareil", "Pages visitees et duree de visite", "Cookies et identifiants de session"]:
-        pdf.bullet(b)
-
-    # Art 3 FR
-    pdf.article_title("Article 3 \u2014 Finalites de la collecte et base juridique")
-    pdf.body("Vos donnees sont utilisees pour les finalites suivantes :")
-    for b in [
-        "Gestion du compte : Creation et administration de votre compte",
-        "Publication d'annonces : Vous permettre de creer et gerer vos annonces",
-        "Messagerie : Faciliter la communication entre utilisateurs",
-        "Amelioration du service : Ameliorer l'experience et les services proposes",
-        "Securite : Lutter contre la fraude et proteger les utilisateurs",
-        "Communication : Envoyer des notifications et informations utiles",
-    ]:
-        pdf.bullet(b)
-    pdf.ln(2)
-    pdf.legal_note(
-        "Base juridique du traitement (Article 14, Loi n\u00b02014-038) : Votre consentement explicite lors de "
-        "l'inscription ; l'execution du contrat (CGU) ; nos obligations legales ; notre interet legitime "
-        "(securite et amelioration du service)."
-    )
-    pdf.legal_note(
-        "Declaration prealable : Conformement aux Articles 43 et 45 de la Loi n\u00b02014-038, Bazary a effectue "
-        "la declaration prealable requise aupres de la CMIL relative au traitement des donnees a caractere personnel."
-    )
-
-    # Art 4 FR
-    pdf.article_title("Article 4 \u2014 Partage des donnees")
-    pdf.body("Nous ne vendons ni ne partageons vos donnees personnelles avec des tiers, sauf dans les cas suivants :")
-    for b in [
-        "Autres utilisateurs : Votre nom, ville et annonces sont visibles par les autres utilisateurs de la plateforme",
-        "Prestataires techniques : Partenaires necessaires au fonctionnement de la plateforme (hebergement, email, etc.) lies par des accords de confidentialite",
-        "Obligations legales : En cas de demande des autorites malgaches conformement a la loi",
-        "Protection de nos droits : Pour proteger les droits de Bazary et de ses utilisateurs",
-    ]:
-        pdf.bullet(b)
-
-    # Art 5 FR
-    pdf.article_title("Article 5 \u2014 Conservation des donnees")
-    pdf.body("Vos donnees sont conservees pendant la duree necessaire aux finalites de leur collecte :")
-    pdf.table(
-        ["Type de donnees", "Duree de conservation"],
-        [
-            ["Donnees de compte", "Jusqu'a la suppression du compte par l'utilisateur"],
-            ["Annonces", "6 mois apres expiration"],
-            ["Messages", "12 mois apres la derniere interaction"],
-            ["Donnees techniques", "12 mois"],
-            ["Donnees de recherche", "6 mois"],
-        ],
-        col_widths=[70, 100],
-    )
-
-    # Art 6 FR
-    pdf.article_title("Article 6 \u2014 Securite des donnees")
-    pdf.body("Nous mettons en place des mesures techniques et organisationnelles pour proteger vos donnees contre tout acces, utilisation ou destruction non autorise :")
-    for b in [
-        "Chiffrement SSL/TLS : Toutes les communications sont chiffrees",
-        "Mots de passe securises : Les mots de passe sont stockes de maniere hashee",
-        "Pare-feu : Protection contre les attaques informatiques",
-        "Surveillance : Monitoring continu de la securite",
-    ]:
-        pdf.bullet(b)
-    pdf.ln(2)
-    pdf.legal_note(
-        "Notification en cas de violation : En cas de violation de donnees personnelles susceptible d'engendrer "
-        "un risque pour vos droits et libertes, Bazary s'engage a : notifier la CMIL dans les meilleurs delais ; "
-        "informer les utilisateurs concernes si la violation presente un risque eleve ; prendre toutes les mesures "
-        "necessaires pour limiter les consequences de la violation."
-    )
-
-    # Art 7 FR
-    pdf.article_title("Article 7 \u2014 Vos droits")
-    pdf.body("Conformement a la legislation en vigueur a Madagascar, vous disposez des droits suivants :")
-    for b in [
-        "Droit d'acces (Art. 23) : Obtenir une copie de vos donnees personnelles collectees",
-        "Droit de rectification (Art. 25) : Corriger vos donnees inexactes ou incompletes",
-        "Droit de suppression : Demander l'effacement de vos donnees",
-        "Droit d'opposition (Art. 22) : Vous opposer au traitement de vos donnees pour motifs legitimes",
-        "Droit de portabilite : Recevoir vos donnees dans un format exploitable",
-    ]:
-        pdf.bullet(b)
-    pdf.ln(2)
-    pdf.body("Pour exercer ces droits, contactez-nous a : contact@bazary.mg")
-    pdf.body("Nous vous repondrons dans un delai de 30 jours.")
-    pdf.legal_note(
-        "Droit de reclamation : Si vous estimez que le traitement de vos donnees n'est pas conforme a la Loi n\u00b02014-038, "
-        "vous avez le droit de deposer une reclamation aupres de la CMIL (Commission Malagasy de l'Informatique et des Libertes)."
-    )
-
-    # Art 8 FR
-    pdf.article_title("Article 8 \u2014 Cookies")
-    pdf.body("Bazary utilise des cookies pour ameliorer votre experience. Les cookies sont de petits fichiers stockes dans votre navigateur.")
-    pdf.table(
-        ["Type", "Finalite", "Duree"],
-        [
-            ["Essentiels", "Fonctionnement de la plateforme (session, langue)", "Session"],
-            ["Fonctionnels", "Memorisation de vos preferences", "12 mois"],
-            ["Analytiques", "Comprendre l'utilisation de la plateforme", "12 mois"],
-        ],
-        col_widths=[40, 85, 45],
-    )
-    pdf.body("Vous pouvez gerer les cookies en modifiant les parametres de votre navigateur.")
-
-    # Art 9 FR
-    pdf.article_title("Article 9 \u2014 Transferts internationaux")
-    pdf.body(
-        "Vos donnees peuvent etre stockees sur des serveurs situes en dehors de Madagascar (notamment pour "
-        "l'hebergement). Conformement a l'Article 20 de la Loi n\u00b02014-038, les transferts ne sont effectues "
-        "que si le pays destinataire assure un niveau de protection adequat, ou sous garanties appropriees "
-        "(clauses contractuelles, autorisation CMIL, ou consentement explicite)."
-    )
-
-    # Art 10 FR
-    pdf.article_title("Article 10 \u2014 Modifications de la politique")
-    pdf.body(
-        "Nous pouvons modifier cette politique a tout moment. Toute modification sera communiquee via une "
-        "notification sur la plateforme. La poursuite de l'utilisation de la Plateforme apres modification "
-        "vaut acceptation de la nouvelle politique."
-    )
-
-    pdf.separator()
-    pdf.sub_heading("DPO \u2014 Delegue a la protection des donnees")
-    pdf.body("Pour toute question relative a vos donnees personnelles :")
-    pdf.body("Email DPO : dpo@bazary.mg | General : contact@bazary.mg | Antananarivo, Madagascar")
-
+    halves.render(pdf, MD_PRIVACY, None if locale is None else LOCALES.index(locale))
     pdf.signature_block()
 
-    pdf.ln(6)
-    pdf.fine_print("Document version: 2026-02-22 | Ref: BZR-PDP-2026-001")
-    pdf.fine_print("This document is the official full-text extraction of the Privacy Policy as displayed on the Bazary platform.")
-    pdf.fine_print("Ce document est l'extraction officielle en texte integral de la Politique de Confidentialite telle qu'affichee sur la plateforme Bazary.")
-
-    out = os.path.join(BASE, "Bazary_Privacy_Policy_EN_FR.pdf")
+    out = OUT_PRIVACY
     pdf.output(out)
     print(f"  [OK] {out}")
+    return out
 
 
 # ============================================================
 if __name__ == "__main__":
-    print("Generating Bazary legal documents (law firm style)...\n")
-    gen_review()
-    gen_terms()
-    gen_privacy()
-    print("\nAll 3 documents generated successfully.")
+    import sys
+    from pdfgen import build
+    sys.exit(build.main())
@@ -1,18 +1,31 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
-from fpdf import FPDF
+from pdfgen import tables
+from pdfgen.base import BasePDF
 import os
 
+FONT = "/Library/Fonts/Arial Unicode.ttf"
+LATIN_FONT = "/System/Library/Fonts/Supplemental/Arial.ttf"
+CJK_FONT = "/System/Library/Fonts/Supplemental/AppleGothic.ttf"  # Hangul
+OUT = os.path.join("/Users/joonkim/\uc790\ub3d9\ucc28 \ubd80\ud488 \uac70\ub798 \uc0ac\uc774\ud2b8", "bazary", "Bazary_Legal_Guide_KR_FR.pdf")
 W = 190  # content width
+TABLE_STYLE = tables.TableStyle(
+    header_font=("KR", "", 9), body_font=("KR", "", 9),
+    header_fill=(255, 111, 15), header_text=(255, 255, 255), header_border=(255, 111, 15),
+    fills=((248, 248, 248),), body_text=(51, 51, 51), body_border=(255, 111, 15),
+    header_line=8, body_line=8)
 
-class PDF(FPDF):
+class PDF(BasePDF):
     def __init__(self):
         super().__init__()
         self.set_auto_page_break(auto=True, margin=25)
-        self.add_font("KR", "", "/Library/Fonts/Arial Unicode.ttf")
+        self.add_font_chain("KR", [LATIN_FONT, CJK_FONT, FONT])
         self.f = "KR"
 
     def header(self):
+        self.static("header", self.header_static)
+
+    def header_static(self):
         self.set_font(self.f, "", 9)
         self.set_text_color(180, 180, 180)
         self.cell(W, 8, "Bazary - Madagascar E-Commerce Legal Guide", new_x="LMARGIN", new_y="NEXT", align="R")
@@ -27,11 +40,16 @@ class PDF(FPDF):
         self.set_text_color(150, 150, 150)
         self.cell(W, 10, f"Page {self.page_no()}/{{nb}}", align="C")
 
-    def h1(self, t):
+    def h1(self, t, toc=None):
+        """Section heading; listed in the TOC (and PDF outline) as `toc`,
+        default `t`, unless toc=False."""
         self.ln(3)
+        if toc is not False:
+            self.start_section(toc or t)
         self.set_font(self.f, "", 16)
         self.set_text_color(255, 111, 15)
         self.multi_cell(w=W, h=9, text=t)
+        self.anchor("h1", t)
         y = self.get_y() + 1
         self.set_draw_color(255, 111, 15)
         self.set_line_width(0.3)
@@ -80,17 +98,35 @@ class PDF(FPDF):
         self.multi_cell(w=W, h=6, text=f)
         self.ln(2)
 
-    def trow(self, cols, widths, hdr=False):
-        if hdr:
-            self.set_fill_color(255, 111, 15)
-            self.set_text_color(255, 255, 255)
-        else:
-            self.set_fill_color(248, 248, 248)
+    def render_toc(self, outline):
+        """Table of contents with dot leaders, from the h1 outline entries."""
+        self.h1("\ubaa9\ucc28 | Table des mati\u00e8res", toc=False)
+        for section in outline:
+            if section.level:
+                continue
+            k, _, f = section.name.partition(" | ")
+            page = str(section.page_number)
+            link = self.add_link(page=section.page_number)
+            self.set_font(self.f, "", 11)
             self.set_text_color(51, 51, 51)
-        self.set_font(self.f, "", 9)
-        for i, c in enumerate(cols):
-            self.cell(widths[i], 8, c, border=1, fill=True, align="C" if hdr else "L")
-        self.ln()
+            room = W - self.get_string_width(f"{k} ") - self.get_string_width(page) - 4 * self.c_margin
+            dots = "." * max(int(room / self.get_string_width(".")), 0)
+            self.cell(W - self.get_string_width(page) - 2 * self.c_margin, 7, f"{k} {dots}", link=link)
+            self.cell(0, 7, page, align="R", link=link, new_x="LMARGIN", new_y="NEXT")
+            if f:
+                self.set_font(self.f, "", 10)
+                self.set_text_color(120, 120, 120)
+                self.multi_cell(w=W, h=6, text=f"    {f}")
+            self.ln(2)
+
+    def table(self, headers, rows, widths=None):
+        """Table from any iterable of rows, with columns fit to their content
+        (or `widths`), wrapped cells and the header repeated after page breaks."""
+        tables.draw(self, headers, rows, TABLE_STYLE, W, widths)
+
+    def trow(self, cols, widths, hdr=False):
+        """A single table row (header style with hdr=True); wraps long cells."""
+        tables.draw(self, cols if hdr else None, [] if hdr else [cols], TABLE_STYLE, W, widths)
 
 
 def main():
@@ -124,32 +160,13 @@ def main():
     pdf.cell(W, 7, "\uc791\uc131\uc77c: 2026\ub144 2\uc6d4 22\uc77c | R\u00e9dig\u00e9 le : 22 f\u00e9vrier 2026", new_x="LMARGIN", new_y="NEXT", align="C")
     pdf.cell(W, 7, "\ud55c\uad6d\uc5b4 / Fran\u00e7ais (\uc774\uc911 \uc5b8\uc5b4 / Bilingue)", new_x="LMARGIN", new_y="NEXT", align="C")
 
-    # TOC
-    pdf.add_page()
-    pdf.h1("\ubaa9\ucc28 | Table des mati\u00e8res")
-    toc = [
-        ("1", "\uac1c\uc694 - \ub9c8\ub2e4\uac00\uc2a4\uce74\ub974 E-Commerce \ud604\ud669", "Aper\u00e7u - Situation du E-Commerce \u00e0 Madagascar"),
-        ("2", "\uad00\ub828 \ubc95\ub960 \uc815\ub9ac", "Cadre Juridique Applicable"),
-        ("3", "\uc0ac\uc5c5\uc790 \ub4f1\ub85d \uc694\uac74", "Conditions d'Enregistrement des Entreprises"),
-        ("4", "\uc678\uad6d\uc778 \ud22c\uc790\uc790 \uc694\uac74", "Conditions pour les Investisseurs \u00c9trangers"),
-        ("5", "\uc0ac\uc774\ud2b8 \uc6b4\uc601 \uc758\ubb34\uc0ac\ud56d", "Obligations li\u00e9es \u00e0 l'Exploitation du Site"),
-        ("6", "\uc138\uae08 \ubc0f \uc7ac\uc815", "Fiscalit\u00e9 et Finances"),
-        ("7", "\ub3c4\uba54\uc778 \ub4f1\ub85d \uc815\ubcf4", "Informations sur l'Enregistrement du Domaine"),
-        ("8", "\ucd94\ucc9c \uc811\uadfc \uc804\ub7b5", "Strat\u00e9gie d'Approche Recommand\u00e9e"),
-        ("9", "\ucd9c\ucc98 \ubc0f \ucc38\uace0\uc790\ub8cc", "Sources et R\u00e9f\u00e9rences"),
-    ]
-    for n, k, f in toc:
-        pdf.set_font(pdf.f, "", 11)
-        pdf.set_text_color(51, 51, 51)
-        pdf.multi_cell(w=W, h=7, text=f"{n}. {k}")
-        pdf.set_font(pdf.f, "", 10)
-        pdf.set_text_color(120, 120, 120)
-        pdf.multi_cell(w=W, h=6, text=f"    {f}")
-        pdf.ln(2)
-
-    # SEC 1
+    # TOC - filled in at output time with the page of every h1
     pdf.add_page()
-    pdf.h1("1. \uac1c\uc694 - \ub9c8\ub2e4\uac00\uc2a4\uce74\ub974 E-Commerce \ud604\ud669")
+    pdf.insert_toc_placeholder(PDF.render_toc)
+
+    # SEC 1 (insert_toc_placeholder has already started its page)
+    pdf.h1("1. \uac1c\uc694 - \ub9c8\ub2e4\uac00\uc2a4\uce74\ub974 E-Commerce \ud604\ud669",
+           toc="1. \uac1c\uc694 - \ub9c8\ub2e4\uac00\uc2a4\uce74\ub974 E-Commerce \ud604\ud669 | Aper\u00e7u - Situation du E-Commerce \u00e0 Madagascar")
     pdf.h2("    Aper\u00e7u - Situation du E-Commerce \u00e0 Madagascar")
     pdf.kr("\ub9c8\ub2e4\uac00\uc2a4\uce74\ub974\uc758 \uc804\uc790\uc0c1\uac70\ub798\ub294 \uc544\uc9c1 \ucd08\uae30 \ub2e8\uacc4\uc5d0 \uc788\uc2b5\ub2c8\ub2e4. \uc628\ub77c\uc778 \uac70\ub798\uc758 78%\uac00 Facebook\uc744 \ud1b5\ud574 \uc774\ub8e8\uc5b4\uc9c0\uace0 \uc788\uc73c\uba70(\uc57d 200\ub9cc \uc0ac\uc6a9\uc790, 2020\ub144 \uae30\uc900), \uc804\ubb38 \uc804\uc790\uc0c1\uac70\ub798 \ud50c\ub7ab\ud3fc\uc740 \ub9e4\uc6b0 \uc81c\ud55c\uc801\uc785\ub2c8\ub2e4. \ubc95\uc801 \ud2c0\uc740 2014\ub144\ubd80\ud130 \ub9c8\ub828\ub418\uc5b4 \uc788\uc73c\ub098, \uc2dc\ud589\ub839\uc774 \ubbf8\ube44\ud558\uc5ec \uc2e4\uc9c8\uc801 \uaddc\uc81c \uc9d1\ud589\uc740 \ub290\uc2a8\ud55c \ud3b8\uc785\ub2c8\ub2e4.")
     pdf.fr("Le commerce \u00e9lectronique \u00e0 Madagascar en est encore \u00e0 ses d\u00e9buts. 78% des achats en ligne se font via Facebook (environ 2 millions d'utilisateurs, 2020), et les plateformes d\u00e9di\u00e9es sont tr\u00e8s limit\u00e9es. Le cadre juridique existe depuis 2014, mais l'absence de d\u00e9crets d'application rend l'application plut\u00f4t souple.")
@@ -186,7 +203,8 @@ def main():
 
     # SEC 3
     pdf.add_page()
-    pdf.h1("3. \uc0ac\uc5c5\uc790 \ub4f1\ub85d \uc694\uac74 | Conditions d'Enregistrement")
+    pdf.h1("3. \uc0ac\uc5c5\uc790 \ub4f1\ub85d \uc694\uac74 | Conditions d'Enregistrement",
+           toc="3. \uc0ac\uc5c5\uc790 \ub4f1\ub85d \uc694\uac74 | Conditions d'Enregistrement des Entreprises")
     pdf.h2("\ud544\uc218 \ub4f1\ub85d \ud56d\ubaa9 | \u00c9l\u00e9ments Obligatoires")
     regs = [
         ("NIF (Num\u00e9ro d'Identification Fiscale)", "\uc138\uae08\uc2dd\ubcc4\ubc88\ud638 - \ubaa8\ub4e0 \uc0ac\uc5c5\uccb4 \ud544\uc218. \uccad\uad6c\uc11c\uc640 \uc138\uae08\uc2e0\uace0\uc5d0 \uc0ac\uc6a9",
@@ -215,7 +233,8 @@ def main():
 
     # SEC 4
     pdf.add_page()
-    pdf.h1("4. \uc678\uad6d\uc778 \ud22c\uc790\uc790 \uc694\uac74 | Investisseurs \u00c9trangers")
+    pdf.h1("4. \uc678\uad6d\uc778 \ud22c\uc790\uc790 \uc694\uac74 | Investisseurs \u00c9trangers",
+           toc="4. \uc678\uad6d\uc778 \ud22c\uc790\uc790 \uc694\uac74 | Conditions pour les Investisseurs \u00c9trangers")
     pdf.h2("\uc678\uad6d\uc778 \uc9c0\ubd84 100% \ud5c8\uc6a9")
     pdf.kr("\ubaa8\ub4e0 \ud68c\uc0ac \ud615\ud0dc\uc5d0\uc11c 100% \uc678\uad6d\uc778 \uc18c\uc720 \uac00\ub2a5. \uc218\uc775 \uc1a1\uae08\uc5d0\ub3c4 \uae08\uc561 \uc81c\ud55c \uc5c6\uc74c.")
     pdf.fr("Participation \u00e9trang\u00e8re \u00e0 100% autoris\u00e9e. Aucune limite sur le rapatriement des revenus.")
@@ -229,7 +248,8 @@ def main():
 
     # SEC 5
     pdf.add_page()
-    pdf.h1("5. \uc0ac\uc774\ud2b8 \uc6b4\uc601 \uc758\ubb34\uc0ac\ud56d | Obligations du Site")
+    pdf.h1("5. \uc0ac\uc774\ud2b8 \uc6b4\uc601 \uc758\ubb34\uc0ac\ud56d | Obligations du Site",
+           toc="5. \uc0ac\uc774\ud2b8 \uc6b4\uc601 \uc758\ubb34\uc0ac\ud56d | Obligations li\u00e9es \u00e0 l'Exploitation du Site")
     obls = [
         ("\ubcf4\uc548 \uc6f9\uc0ac\uc774\ud2b8 \ud544\uc218 (HTTPS/SSL)", "Site s\u00e9curis\u00e9 obligatoire (HTTPS/SSL)"),
         ("\ud310\ub9e4\uc790-\uad6c\ub9e4\uc790 \uac04 \uc11c\uba74 \ub3d9\uc758 \uc808\ucc28", "Accord \u00e9crit vendeur-acheteur requis"),
@@ -269,22 +289,24 @@ def main():
 
     # SEC 7
     pdf.add_page()
-    pdf.h1("7. \ub3c4\uba54\uc778 \ub4f1\ub85d \uc815\ubcf4 | Domaine")
+    pdf.h1("7. \ub3c4\uba54\uc778 \ub4f1\ub85d \uc815\ubcf4 | Domaine",
+           toc="7. \ub3c4\uba54\uc778 \ub4f1\ub85d \uc815\ubcf4 | Informations sur l'Enregistrement du Domaine")
     pdf.kr("bazary.mg \ub3c4\uba54\uc778 \ud655\uc778 \uacb0\uacfc: \ud604\uc7ac \ubbf8\ub4f1\ub85d, \uad6c\ub9e4 \uac00\ub2a5!")
     pdf.fr("bazary.mg : Non enregistr\u00e9, disponible \u00e0 l'achat!")
     pdf.kr("\ub4f1\ub85d \uc870\uac74: \ub204\uad6c\ub098 \uac00\ub2a5(\uad6d\uc801 \ubb34\uad00), 2~63\uc790, 1~5\ub144 \ub2e8\uc704")
     pdf.fr("Ouvert \u00e0 tous, 2-63 caract\u00e8res, 1-5 ans")
     pdf.h2("\uac00\uaca9 \ube44\uad50 | Comparaison des Prix")
-    cw = [48, 48, 48, 46]
-    pdf.trow(["Registraire", "Enregistrement", "Renouvellement", "Note"], cw, hdr=True)
-    pdf.trow(["Gandi.net", "\u20ac90/an (~$97)", "\u20ac180/an (~$194)", "Recommand\u00e9"], cw)
-    pdf.trow(["DomainTyper", "$122~/an", "-", ""], cw)
-    pdf.trow(["INWX", "\u20ac126/an (~$136)", "-", "Allemagne"], cw)
-    pdf.trow(["OVHcloud", "$130/an", "-", "France"], cw)
+    pdf.table(["Registraire", "Enregistrement", "Renouvellement", "Note"], [
+        ["Gandi.net", "\u20ac90/an (~$97)", "\u20ac180/an (~$194)", "Recommand\u00e9"],
+        ["DomainTyper", "$122~/an", "-", ""],
+        ["INWX", "\u20ac126/an (~$136)", "-", "Allemagne"],
+        ["OVHcloud", "$130/an", "-", "France"],
+    ])
 
     # SEC 8
     pdf.add_page()
-    pdf.h1("8. \ucd94\ucc9c \uc811\uadfc \uc804\ub7b5 | Strat\u00e9gie Recommand\u00e9e")
+    pdf.h1("8. \ucd94\ucc9c \uc811\uadfc \uc804\ub7b5 | Strat\u00e9gie Recommand\u00e9e",
+           toc="8. \ucd94\ucc9c \uc811\uadfc \uc804\ub7b5 | Strat\u00e9gie d'Approche Recommand\u00e9e")
     stages = [
         ("1\ub2e8\uacc4 - \ud14c\uc2a4\ud2b8 \ub7f0\uce6d | \u00c9tape 1 - Test",
          "\uc0ac\uc5c5\uc790 \ub4f1\ub85d \uc5c6\uc774 \uc0ac\uc774\ud2b8 \ub7f0\uce6d, \uc720\uc800 \ubc18\uc751 \ud655\uc778. Facebook 78% \uc2dc\uc7a5\uc5d0\uc11c \uc804\ubb38 \ud50c\ub7ab\ud3fc \uc218\uc694 \uac80\uc99d. Vercel \ubb34\ub8cc + MongoDB Atlas \ubb34\ub8cc.",
@@ -355,10 +377,11 @@ def main():
     pdf.multi_cell(w=W, h=5, text="\uba74\ucc45\uc0ac\ud56d: \ubcf8 \ubb38\uc11c\ub294 \uc815\ubcf4 \uc81c\uacf5 \ubaa9\uc801\uc73c\ub85c \uc791\uc131\ub418\uc5c8\uc73c\uba70, \ubc95\ub960 \uc790\ubb38\uc744 \ub300\uccb4\ud558\uc9c0 \uc54a\uc2b5\ub2c8\ub2e4. \uc2e4\uc81c \uc0ac\uc5c5 \uc9c4\ud589 \uc2dc \ud604\uc9c0 \ubc95\ub960 \uc804\ubb38\uac00\uc640 \uc0c1\ub2f4\ud558\uc2dc\uae30 \ubc14\ub78d\ub2c8\ub2e4.")
     pdf.multi_cell(w=W, h=5, text="Avertissement : Document informatif, ne remplace pas un conseil juridique professionnel.")
 
-    out = os.path.join("/Users/joonkim/\uc790\ub3d9\ucc28 \ubd80\ud488 \uac70\ub798 \uc0ac\uc774\ud2b8", "bazary", "Bazary_Legal_Guide_KR_FR.pdf")
+    out = OUT
     pdf.output(out)
     print(f"PDF saved: {out}")
     print(f"Pages: {pdf.pages_count}")
+    return out
 
 if __name__ == "__main__":
     main()
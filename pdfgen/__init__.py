@@ -0,0 +1,10 @@
+# -*- coding: utf-8 -*-
+"""
+Shared build tooling for the Bazary PDF generators
+(generate-legal-pdfs.py and generate-pdf.py).
+"""
+import os
+
+# On-disk caches (font metrics, layout). Set BAZARY_PDF_CACHE="" to disable.
+CACHE_DIR = os.environ.get(
+    "BAZARY_PDF_CACHE", os.path.join(os.path.expanduser("~"), ".cache", "bazary-pdf"))
@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+"""
+Common base class for LegalDoc (generate-legal-pdfs.py) and PDF
+(generate-pdf.py).
+"""
+import contextlib
+import os
+from datetime import datetime, timezone
+
+from fpdf import FPDF
+from fpdf.line_break import Fragment
+
+from . import coverage, fonts, forms, layout, streams
+from .output import Producer
+from .spool import FileBuffer, Spool, SpooledContents
+
+# Page count and heading pages of every document output() while this is a
+# list: the build runner sets one per job (dry-run report, build manifest),
+# other callers record nothing.
+layouts = None
+
+
+def source_date():
+    """The date SOURCE_DATE_EPOCH (seconds since 1970, UTC) sets, or None."""
+    value = os.environ.get("SOURCE_DATE_EPOCH")
+    if value is None:
+        return None
+    try:
+        return datetime.fromtimestamp(int(value), timezone.utc)
+    except (ValueError, OverflowError, OSError):
+        raise ValueError(f"SOURCE_DATE_EPOCH is not a number of seconds: {value!r}") from None
+
+
+class BasePDF(FPDF):
+    """FPDF with process-wide font sharing, per-codepoint font fallback,
+    cached line breaking and redundant graphics-state elimination at output."""
+
+    # Layout-only run: output() records the pagination but writes nothing,
+    # so content streams are never serialized, compressed or embedded.
+    dry_run = False
+
+    # Threads compressing page streams and font data at output (see
+    # pdfgen.output); 1 compresses inline as fpdf does.
+    compress_threads = 1
+
+    # Move each finished page to a temporary file and write the PDF straight
+    # to its destination, so memory stays flat however many pages there are
+    # (see pdfgen.spool).
+    spool = False
+
+    # Same inputs, same bytes: the creation date is SOURCE_DATE_EPOCH, or
+    # left out without it, so the /ID (an MD5 of the file) only depends on
+    # the content. SOURCE_DATE_EPOCH alone also turns this on.
+    reproducible = False
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.reproducible or "SOURCE_DATE_EPOCH" in os.environ:
+            self.creation_date = source_date()
+        self.anchors = []
+        self._forms = {}  # static block name -> (xobject index, x, y after it)
+        self._spool = Spool() if self.spool else None
+        self._spool_target = None  # file output() writes through to
+        self.font_chains = {}  # family -> its fallback families, in order
+
+    def add_font(self, family=None, style="", fname=None, **kwargs):
+        if kwargs or not family or not fname or not fonts.add_font(self, family, style, fname):
+            super().add_font(family, style, fname, **kwargs)
+
+    def add_font_chain(self, family, fnames, styles=("",)):
+        """Register `family` from the first of `fnames` that exists and the
+        others as its fallbacks, tried in order for each codepoint it lacks
+        (see pdfgen.coverage). With none on disk, the last one is used."""
+        found = [f for f in fnames if os.path.isfile(f)] or list(fnames[-1:])
+        names = [family] + [f"{family}_{n}" for n in range(1, len(found))]
+        for name, fname in zip(names, found):
+            for style in styles:
+                self.add_font(name, style, fname)
+        self.font_chains[family.lower()] = [n.lower() for n in names[1:]]
+
+    def _font_chain(self):
+        """[(family, style, Coverage)] of the current font and its fallbacks,
+        or None when it has none."""
+        fallbacks = self.font_chains.get(self.font_family)
+        if not fallbacks or not self.is_ttf_font:
+            return None
+        chain = [(self.font_family, self.font_style, coverage.of(self.current_font))]
+        for family in fallbacks:
+            style = self.font_style if family + self.font_style in self.fonts else ""
+            chain.append((family, style, coverage.of(self.fonts[family + style])))
+        return chain
+
+    def _parse_chars(self, text, markdown, **kwargs):
+        chain = None if markdown else self._font_chain()
+        if chain is None:
+            return super()._parse_chars(text, markdown, **kwargs)
+        frags = []
+        for n, part in coverage.runs(text, [cov for _, _, cov in chain]):
+            if n == 0:  # fpdf's plain path, {nb} included
+                frags.extend(super()._parse_chars(part, markdown, **kwargs))
+                continue
+            family, style, _ = chain[n]
+            gstate = self._get_current_graphics_state()
+            gstate.font_family = family
+            gstate.font_style = style
+            gstate.current_font = self.fonts[family + style]
+            frags.append(Fragment(part, gstate, self.k))
+        return frags
+
+    def _pin_page_font(self):
+        # A line whose first run is in a fallback font would otherwise make
+        # fpdf select the page font inside the line's q/Q (and lose it after)
+        # or adopt the fallback as the current font.
+        if (self.page and not self.current_font_is_set_on_page and self.current_font is not None
+                and self.font_chains.get(self.font_family)):
+            self._out(self._set_font_for_page(self.current_font, self.font_size_pt))
+
+    def _render_styled_text_line(self, *args, **kwargs):
+        self._pin_page_font()
+        return super()._render_styled_text_line(*args, **kwargs)
+
+    def _perform_page_break_if_need_be(self, h):
+        broke = super()._perform_page_break_if_need_be(h)
+        if broke:
+            self._pin_page_font()
+        return broke
+
+    def multi_cell(self, *args, **kwargs):
+        with layout.cached():
+            return super().multi_cell(*args, **kwargs)
+
+    def static(self, name, paint):
+        """Draw a block that is identical on every page (header rules and
+        labels) once as a form XObject and reference it from each page."""
+        forms.draw(self, name, paint)
+
+    def continuation_args(self):
+        """Constructor arguments of a document continuing this one (see
+        pdfgen.halves), or None when it cannot be continued elsewhere."""
+        return None
+
+    def anchor(self, kind, text):
+        """Record the page a heading was laid out on."""
+        self.anchors.append((kind, text, self.page_no()))
+
+    def _beginpage(self, *args, **kwargs):
+        if self._spool is not None and self.page and not self.in_toc_rendering:
+            self._spool_page(self.pages[self.page])
+        super()._beginpage(*args, **kwargs)
+
+    def _spool_page(self, page):
+        toc = self.toc_placeholder
+        if toc and toc.start_page <= page.index() < toc.start_page + toc.pages:
+            return  # the table of contents is drawn onto it at output
+        if not isinstance(page.contents, SpooledContents):
+            contents, _ = streams.eliminate(page.contents)
+            page.contents = SpooledContents(self._spool, contents)
+
+    def _default_file_id(self, buffer):
+        if not isinstance(buffer, FileBuffer):
+            return super()._default_file_id(buffer)
+        # Same as fpdf's: the MD5 of everything written before the trailer
+        id_hash = buffer.md5.copy()
+        if self.creation_date:
+            id_hash.update(self.creation_date.strftime("%Y%m%d%H%M%S").encode("utf8"))
+        hash_hex = id_hash.hexdigest().upper()
+        return f"<{hash_hex}><{hash_hex}>"
+
+    def output(self, name="", *args, **kwargs):
+        if layouts is not None:
+            layouts.append({"pages": self.pages_count, "anchors": [list(a) for a in self.anchors]})
+        if self.dry_run:
+            return None
+        kwargs.setdefault("output_producer_class", Producer)
+        if self._spool is None:
+            return super().output(name, *args, **kwargs)
+        try:
+            if not name:
+                return super().output(name, *args, **kwargs)
+            if not isinstance(name, (str, os.PathLike)):
+                self._spool_target = name
+                super().output("", *args, **kwargs)
+                return None
+            part = f"{os.fspath(name)}.part"
+            try:
+                with open(part, "wb") as self._spool_target:
+                    super().output("", *args, **kwargs)
+                os.replace(part, name)
+            except BaseException:
+                with contextlib.suppress(OSError):
+                    os.remove(part)
+                raise
+            return None
+        finally:
+            self._spool.close()
@@ -0,0 +1,280 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmarks for the PDF generators, with a local regression check.
+
+    python -m pdfgen.bench                    # run micro + macro + corpus, compare
+    python -m pdfgen.bench --save             # run and store as the new baseline
+    python -m pdfgen.bench micro              # only some groups
+    python -m pdfgen.bench corpus --pages 100,1000,10000
+
+Groups:
+    micro   each LegalDoc primitive (body, bullet, table, section_title,
+            cover) and PDF primitive (kr, fr, item, trow), called CALLS
+            times on a fresh document
+    macro   gen_review, gen_terms, gen_privacy and the guide's main()
+    corpus  synthetic LegalDoc scaled to N pages (see corpus())
+
+Every benchmark records its wall time (best of --repeat runs, so caches
+are warm), the peak traced memory of one extra run under tracemalloc and
+the size of the PDF it produces. Both language halves of a document are
+laid out in the process being measured (see pdfgen.halves). Results are
+compared with the baseline in .bazary-bench.json at the repository root
+(machine specific, not committed); a value above the baseline by more
+than its threshold is a regression and the command exits with 1.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import fpdf
+
+from . import base, halves
+from .build import ROOT, load_script
+
+BASELINE = os.path.join(ROOT, ".bazary-bench.json")
+CALLS = 200
+GROUPS = ["micro", "macro", "corpus"]
+
+# Allowed growth over the baseline, and the absolute change below which a
+# difference is noise whatever its ratio
+THRESHOLDS = {"seconds": 0.20, "peak_kib": 0.10, "bytes": 0.02}
+FLOORS = {"seconds": 0.005, "peak_kib": 64, "bytes": 512}
+
+SENTENCE = ("The platform acts solely as a technical intermediary (hebergeur) and is not a party "
+            "to any transaction between users. / La plateforme agit uniquement en qualite "
+            "d'intermediaire technique.")
+
+
+def _legal():
+    return load_script("generate-legal-pdfs.py")
+
+
+def _guide():
+    return load_script("generate-pdf.py")
+
+
+def _legal_doc():
+    pdf = _legal().LegalDoc("BZR-BENCH-001", "Benchmark")
+    pdf.add_page()
+    return pdf
+
+
+def _guide_doc():
+    pdf = _guide().PDF()
+    pdf.add_page()
+    return pdf
+
+
+def _table(pdf, i):
+    pdf.table(["Protection Mechanism", "Legal Basis", "Strength"],
+              [[f"Clause {i}.{r} - {SENTENCE[:60]}", f"Art. {r} CGU", "STRONG / SOLIDE"] for r in range(10)])
+
+
+def _cover(pdf, i):
+    pdf.cover([f"Benchmark {i}"], ["Conditions Generales d'Utilisation"],
+              ["Document Reference: BZR-BENCH-001", "Platform: Bazary (www.bazary.mg)"])
+
+
+# name -> (document factory, primitive call)
+MICRO = {
+    "legal.body": (_legal_doc, lambda pdf, i: pdf.body(f"{i}. {SENTENCE}")),
+    "legal.bullet": (_legal_doc, lambda pdf, i: pdf.bullet(f"{i}. {SENTENCE}")),
+    "legal.table": (_legal_doc, _table),
+    "legal.section_title": (_legal_doc, lambda pdf, i: pdf.section_title(f"Section {i}")),
+    "legal.cover": (_legal_doc, _cover),
+    "guide.kr": (_guide_doc, lambda pdf, i: pdf.kr(f"{i}. \ub9c8\ub2e4\uac00\uc2a4\uce74\ub974 \uc911\uace0\uac70\ub798 \ud50c\ub7ab\ud3fc")),
+    "guide.fr": (_guide_doc, lambda pdf, i: pdf.fr(f"{i}. {SENTENCE}")),
+    "guide.item": (_guide_doc, lambda pdf, i: pdf.item(f"{i}. \ud56d\ubaa9", SENTENCE)),
+    "guide.trow": (_guide_doc, lambda pdf, i: pdf.trow(["Gandi.net", f"\u20ac{i}/an", "-", "Recommand\u00e9"],
+                                                       [48, 48, 48, 46])),
+}
+
+
+def corpus(pages):
+    """A LegalDoc of at least `pages` pages: a cover, then the Terms of Use
+    Markdown source rendered again and again. Returns the document, not
+    yet output()."""
+    legal = _legal()
+    from . import markdown
+    pdf = legal.LegalDoc("BZR-CORPUS-001", f"Synthetic corpus ({pages} pages)")
+    pdf.cover([f"Synthetic corpus - {pages} pages"], ["Benchmark"], [])
+    while pdf.pages_count < pages:
+        markdown.render(pdf, legal.MD_TERMS)
+    return pdf
+
+
+def _output_size(pdf):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.pdf")
+        pdf.output(path)
+        return os.path.getsize(path)
+
+
+def _micro(name):
+    factory, call = MICRO[name]
+
+    def run():
+        pdf = factory()
+        for i in range(CALLS):
+            call(pdf, i)
+        return pdf
+    return run
+
+
+def _macro(script, func, out):
+    def run():
+        mod = load_script(script)
+        with tempfile.TemporaryDirectory() as tmp:
+            saved = getattr(mod, out)
+            setattr(mod, out, os.path.join(tmp, os.path.basename(saved)))
+            try:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    path = getattr(mod, func)()
+                return os.path.getsize(path)
+            finally:
+                setattr(mod, out, saved)
+    return run
+
+
+def benchmarks(groups, pages):
+    """{name: callable} - a callable returns a document to output() or,
+    for the macro group, the size of the file it wrote."""
+    found = {}
+    if "micro" in groups:
+        found.update((f"micro.{name}", _micro(name)) for name in MICRO)
+    if "macro" in groups:
+        found["macro.review"] = _macro("generate-legal-pdfs.py", "gen_review", "OUT_REVIEW")
+        found["macro.terms"] = _macro("generate-legal-pdfs.py", "gen_terms", "OUT_TERMS")
+        found["macro.privacy"] = _macro("generate-legal-pdfs.py", "gen_privacy", "OUT_PRIVACY")
+        found["macro.guide"] = _macro("generate-pdf.py", "main", "OUT")
+    if "corpus" in groups:
+        found.update((f"corpus.{n}", lambda n=n: corpus(n)) for n in pages)
+    return found
+
+
+def measure(run, repeat):
+    """seconds (best of `repeat`), peak_kib and bytes of one benchmark."""
+    best = None
+    size = 0
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = run()
+        if not isinstance(result, int):
+            result = _output_size(result)  # writing the file is part of the cost
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+        size = result
+    tracemalloc.start()
+    try:
+        result = run()
+        if not isinstance(result, int):
+            _output_size(result)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {"seconds": round(best, 4), "peak_kib": round(peak / 1024), "bytes": size}
+
+
+def compare(results, baseline):
+    """[(name, metric, before, now)] of the values beyond their threshold."""
+    regressions = []
+    for name, now in results.items():
+        before = baseline.get(name)
+        if not before:
+            continue
+        for metric, limit in THRESHOLDS.items():
+            b, n = before.get(metric), now.get(metric)
+            if b is None or n is None:
+                continue
+            if n > b * (1 + limit) and n - b > FLOORS[metric]:
+                regressions.append((name, metric, b, n))
+    return regressions
+
+
+def _delta(now, before):
+    if not before:
+        return ""
+    return f"{(now - before) / before * 100:+5.0f}%"
+
+
+def report(results, baseline):
+    print(f"\n  {'benchmark':<28} {'seconds':>9} {'':>6} {'peak KiB':>9} {'':>6} {'bytes':>10} {'':>6}")
+    for name, r in results.items():
+        b = baseline.get(name, {})
+        print(f"  {name:<28} {r['seconds']:9.4f} {_delta(r['seconds'], b.get('seconds')):>6}"
+              f" {r['peak_kib']:9d} {_delta(r['peak_kib'], b.get('peak_kib')):>6}"
+              f" {r['bytes']:10d} {_delta(r['bytes'], b.get('bytes')):>6}")
+
+
+def load_baseline(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f).get("results", {})
+    except (OSError, ValueError):
+        return {}
+
+
+def save_baseline(path, results):
+    stored = {"machine": {"python": platform.python_version(), "fpdf": fpdf.__version__,
+                          "platform": platform.platform(), "cpus": os.cpu_count()},
+              "results": {**load_baseline(path), **results}}
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(stored, f, indent=1, sort_keys=True)
+
+
+def parse_args(argv=None):
+    p = argparse.ArgumentParser(description="Benchmark the Bazary PDF generators.")
+    p.add_argument("groups", nargs="*", metavar="GROUP", help=f"{', '.join(GROUPS)} (default: all)")
+    p.add_argument("--pages", default="100",
+                   help="comma-separated corpus sizes in pages (default: 100; e.g. 100,1000,10000)")
+    p.add_argument("--repeat", type=int, default=3, help="timed runs per benchmark, best kept (default 3)")
+    p.add_argument("--baseline", default=BASELINE, help=f"baseline file (default: {BASELINE})")
+    p.add_argument("--save", action="store_true", help="store the results as the new baseline")
+    for metric, limit in THRESHOLDS.items():
+        p.add_argument(f"--max-{metric.replace('_', '-')}", type=float, default=limit, dest=metric,
+                       help=f"allowed {metric} growth over the baseline (default {limit:.0%})")
+    args = p.parse_args(argv)
+    unknown = set(args.groups) - set(GROUPS)
+    if unknown:
+        p.error(f"unknown group(s): {', '.join(sorted(unknown))}")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    THRESHOLDS.update({m: getattr(args, m) for m in THRESHOLDS})
+    base.BasePDF.dry_run = False
+    halves.parallel = False  # time the layout of both halves, not a worker start
+    pages = [int(n) for n in args.pages.split(",") if n.strip()]
+    baseline = load_baseline(args.baseline)
+    results = {}
+    for name, run in benchmarks(args.groups or GROUPS, pages).items():
+        print(f"  {name} ...", flush=True)
+        results[name] = measure(run, args.repeat)
+    report(results, baseline)
+    if args.save:
+        save_baseline(args.baseline, results)
+        print(f"\nBaseline saved to {args.baseline}")
+        return 0
+    if not baseline:
+        print(f"\nNo baseline at {args.baseline}; run with --save to create one.")
+        return 0
+    regressions = compare(results, baseline)
+    for name, metric, before, now in regressions:
+        print(f"  REGRESSION {name} {metric}: {before} -> {now}")
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond the thresholds.")
+        return 1
+    print("\nNo regressions.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
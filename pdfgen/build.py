@@ -0,0 +1,358 @@
+# -*- coding: utf-8 -*-
+"""
+Build runner - renders the independent documents in a process pool
+and reports wall-clock time against the serial baseline.
+
+    python generate-legal-pdfs.py --jobs 4
+    python generate-legal-pdfs.py terms privacy
+    python generate-legal-pdfs.py --all
+    python generate-legal-pdfs.py --force    # ignore the build manifest
+    python generate-legal-pdfs.py --dry-run  # layout only: pages and headings
+    python generate-legal-pdfs.py --threads 8  # compression threads per document
+    python generate-legal-pdfs.py --spool      # pages to a temp file, flat memory
+    python generate-legal-pdfs.py --trace t.json  # Chrome trace of the build
+    python generate-legal-pdfs.py --mem-report    # memory per document and phase
+    python generate-legal-pdfs.py --check      # glyph coverage only, no layout
+    python generate-legal-pdfs.py --split-halves  # FR in a second process
+    python generate-legal-pdfs.py --watch      # rebuild what an edit affects
+    python generate-legal-pdfs.py --reproducible  # same inputs, same bytes
+
+Documents whose inputs are unchanged since the last build are skipped
+(see pdfgen.manifest). Each worker saves the line-breaking cache it
+filled (see pdfgen.layout) and its hit rate is shown per document,
+along with the graphics-state operators dropped at output (see
+pdfgen.streams).
+
+--dry-run lays the documents out without writing them and compares the
+page count and heading pages with the last build; it exits with 2 when
+they changed, for use as a pre-commit check. --check (see pdfgen.check)
+exits with 1 when a character has no glyph in the document's fonts.
+
+--reproducible (or SOURCE_DATE_EPOCH in the environment) makes each PDF
+a function of its inputs only: the creation date is SOURCE_DATE_EPOCH
+or left out, and the /ID is the MD5 of the file. The bytes do not
+depend on --jobs, --threads, --spool, --split-halves or the CPU count
+either: the last language section is always laid out on its own and
+appended, in a second process only with --split-halves and more than
+one CPU (see pdfgen.halves).
+"""
+import argparse
+import contextlib
+import importlib.util
+import io
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+
+from . import base, check, halves, layout, manifest, memprof, streams, trace, watch
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@dataclass(frozen=True)
+class Job:
+    """One document: a generator function inside one of the scripts,
+    writing to the path held by the script constant `out`."""
+    name: str
+    script: str
+    func: str
+    out: str
+
+
+@dataclass
+class Result:
+    name: str
+    ok: bool
+    seconds: float
+    out: str = ""
+    error: str = ""
+    skipped: bool = False
+    line_hits: int = 0
+    line_misses: int = 0
+    ops_removed: int = 0
+    layout: dict = None
+    trace: list = None
+    memory: dict = None
+
+
+JOBS = [
+    Job("review", "generate-legal-pdfs.py", "gen_review", "OUT_REVIEW"),
+    Job("terms", "generate-legal-pdfs.py", "gen_terms", "OUT_TERMS"),
+    Job("privacy", "generate-legal-pdfs.py", "gen_privacy", "OUT_PRIVACY"),
+    Job("guide", "generate-pdf.py", "main", "OUT"),
+]
+DEFAULT = ["review", "terms", "privacy"]
+
+
+def load_script(script, reload=False):
+    """Import a generator script by file name (the names are not valid
+    modules); `reload` imports it again, after the file changed."""
+    name = os.path.splitext(script)[0].replace("-", "_")
+    mod = None if reload else sys.modules.get(name)
+    if mod is None:
+        spec = importlib.util.spec_from_file_location(name, os.path.join(ROOT, script))
+        mod = importlib.util.module_from_spec(spec)
+        sys.modules[name] = mod
+        try:
+            spec.loader.exec_module(mod)
+        except BaseException:
+            del sys.modules[name]  # imported again on the next call
+            raise
+    return mod
+
+
+def run_job(job, dry_run=False, threads=1, spool=False, traced=False, profiled=False,
+            split_halves=False, reproducible=False):
+    """Render (or only lay out) one document. Runs inside a pool worker;
+    never raises. With `traced` / `profiled`, the result carries the job's
+    trace events / memory profile. `split_halves` lays the last language
+    half of a bilingual document out in a second process (see
+    pdfgen.halves), except when traced or profiled: both halves are then
+    laid out here, where they are recorded.
+    `reproducible` sets BasePDF.reproducible."""
+    t0 = time.perf_counter()
+    before = layout.stats()
+    removed = streams.stats()["removed"]
+    base.BasePDF.dry_run = dry_run
+    base.BasePDF.compress_threads = threads
+    base.BasePDF.spool = spool
+    base.BasePDF.reproducible = reproducible
+    halves.parallel = split_halves and not (traced or profiled)
+    layouts = base.layouts = []
+    try:
+        mod = load_script(job.script)
+        if traced:
+            trace.instrument_module(mod)
+            trace.label(job.name)
+        if profiled:
+            memprof.instrument_module(mod)
+            memprof.start()
+        quiet = contextlib.redirect_stdout(io.StringIO()) if dry_run else contextlib.nullcontext()
+        try:
+            with quiet:
+                out = getattr(mod, job.func)()
+        finally:
+            memory = memprof.stop() if profiled else None
+        r = Result(job.name, True, time.perf_counter() - t0, out=out or "",
+                   layout=layouts[-1] if layouts else None, memory=memory)
+    except Exception as e:
+        r = Result(job.name, False, time.perf_counter() - t0,
+                   error=f"{type(e).__name__}: {e}\n{traceback.format_exc()}")
+    finally:
+        base.layouts = None
+    after = layout.stats()
+    r.line_hits = after["hits"] - before["hits"]
+    r.line_misses = after["misses"] - before["misses"]
+    r.ops_removed = streams.stats()["removed"] - removed
+    if traced:
+        r.trace = trace.take()
+    layout.save()
+    return r
+
+
+def run(jobs, workers=1, force=False, dry_run=False, threads=1, spool=False, traced=False,
+        profiled=False, split_halves=False, reproducible=False):
+    """Render the out-of-date `jobs` (all of them with `force` or
+    `dry_run`), in-process when workers == 1, else in a process pool.
+    Each document compresses its streams on `threads` threads and, with
+    `spool`, keeps its finished pages in a temporary file. `traced` and
+    `profiled` collect trace events and a memory profile in each Result.
+    `split_halves` lays the language halves of a document out in parallel
+    when the machine has more than one CPU.
+    `reproducible` writes the same bytes for the same inputs.
+
+    Returns (results in job order, wall-clock seconds).
+    """
+    t0 = time.perf_counter()
+    by_name, todo, digests = {}, [], {}
+    for j in jobs:
+        mod = load_script(j.script)
+        out = getattr(mod, j.out)
+        digests[j.name] = manifest.input_hash(mod, j.func, reproducible)
+        if not (force or dry_run) and manifest.up_to_date(j.name, out, digests[j.name]):
+            by_name[j.name] = Result(j.name, True, 0.0, out=out, skipped=True)
+        else:
+            todo.append(j)
+    if workers <= 1 or len(todo) <= 1:
+        done = [run_job(j, dry_run, threads, spool, traced, profiled, split_halves,
+                        reproducible)
+                for j in todo]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(todo))) as pool:
+            futures = [pool.submit(run_job, j, dry_run, threads, spool, traced, profiled,
+                                   split_halves, reproducible)
+                       for j in todo]
+            done = [f.result() for f in as_completed(futures)]
+    for r in done:
+        by_name[r.name] = r
+        if r.ok and r.out and not dry_run:
+            manifest.record(r.name, r.out, digests[r.name], r.layout)
+    return [by_name[j.name] for j in jobs], time.perf_counter() - t0
+
+
+def report(results, wall, workers):
+    """Print per-document timings and the speedup over a serial build."""
+    print()
+    for r in results:
+        status = "up to date" if r.skipped else "ok" if r.ok else "FAILED"
+        lines = r.line_hits + r.line_misses
+        cached = f"  (line cache {r.line_hits}/{lines} hits)" if lines else ""
+        ops = f"  ({r.ops_removed} redundant ops removed)" if r.ops_removed else ""
+        print(f"  {r.name:<10} {r.seconds:6.2f}s  {status}{cached}{ops}")
+        if not r.ok:
+            for line in r.error.rstrip().splitlines():
+                print(f"      {line}")
+    serial = sum(r.seconds for r in results)
+    speedup = serial / wall if wall else 0
+    print(f"\nWall {wall:.2f}s vs serial {serial:.2f}s ({speedup:.1f}x, {workers} jobs)")
+
+
+def _headings(anchors):
+    """{(kind, text, n-th occurrence): page} - EN and FR may share titles."""
+    seen, out = {}, {}
+    for kind, text, page in anchors:
+        n = seen[(kind, text)] = seen.get((kind, text), 0) + 1
+        out[(kind, text, n)] = page
+    return out
+
+
+def layout_changes(job, result):
+    """Differences between a dry-run layout and the last build's, as lines."""
+    mod = load_script(job.script)
+    before = manifest.load(getattr(mod, job.out)).get(job.name, {}).get("layout")
+    if not before:
+        return None
+    now = result.layout or {"pages": 0, "anchors": []}
+    changes = []
+    if before["pages"] != now["pages"]:
+        changes.append(f"pages: {before['pages']} -> {now['pages']}")
+    old, new = _headings(before["anchors"]), _headings(now["anchors"])
+    for key, page in new.items():
+        if key not in old:
+            changes.append(f"p{page:<3} {key[1]}  (new)")
+        elif old[key] != page:
+            changes.append(f"p{page:<3} {key[1]}  (was p{old[key]})")
+    for key in old:
+        if key not in new:
+            changes.append(f"     {key[1]}  (removed)")
+    return changes
+
+
+def report_dry_run(jobs, results):
+    """Print page counts and moved headings; return True if anything changed."""
+    print()
+    changed = False
+    for job, r in zip(jobs, results):
+        if not r.ok:
+            continue
+        heads = len(r.layout["anchors"]) if r.layout else 0
+        pages = r.layout["pages"] if r.layout else 0
+        print(f"  {r.name:<10} {r.seconds:6.2f}s  {pages} pages, {heads} headings")
+        diff = layout_changes(job, r)
+        if diff is None:
+            print("      no previous build to compare with")
+            continue
+        changed |= bool(diff)
+        for line in diff:
+            print(f"      {line}")
+    return changed
+
+
+def parse_args(argv=None):
+    p = argparse.ArgumentParser(description="Build the Bazary PDF documents.")
+    p.add_argument("docs", nargs="*", metavar="DOC",
+                   help=f"documents to build: {', '.join(j.name for j in JOBS)} "
+                        f"(default: {' '.join(DEFAULT)})")
+    p.add_argument("--all", action="store_true", help="build every document, including the KR/FR guide")
+    p.add_argument("--force", action="store_true", help="rebuild even if the inputs are unchanged")
+    p.add_argument("--dry-run", action="store_true",
+                   help="lay out only: report pages and heading moves, write nothing")
+    p.add_argument("--check", action="store_true",
+                   help="only check that the fonts have a glyph for every character "
+                        "of the text; nothing is laid out or written")
+    p.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1,
+                   help="worker processes (default: CPU count, 1 = serial in-process)")
+    p.add_argument("--threads", type=int, default=None,
+                   help="compression threads per document "
+                        "(default: CPU count divided among the worker processes)")
+    p.add_argument("--spool", action="store_true",
+                   help="keep finished pages in a temporary file and write each PDF "
+                        "straight to disk, for very large documents")
+    p.add_argument("--trace", metavar="FILE",
+                   help="record every primitive, page and output phase as Chrome trace JSON")
+    p.add_argument("--mem-report", action="store_true",
+                   help="profile memory per document: peak and top allocation sites "
+                        "of the font load, layout and output phases")
+    p.add_argument("--watch", action="store_true",
+                   help="after the build, keep rebuilding (in this process, with warm "
+                        "caches) the documents whose sources change")
+    p.add_argument("--split-halves", action="store_true",
+                   help="lay out the French version of a document in a second process, "
+                        "alongside the English one (only with more than one CPU; "
+                        "not with --watch)")
+    p.add_argument("--reproducible", action="store_true",
+                   help="write the same bytes for the same inputs: creation date from "
+                        "SOURCE_DATE_EPOCH (none without it), /ID from the content")
+    args = p.parse_args(argv)
+    unknown = set(args.docs) - {j.name for j in JOBS}
+    if unknown:
+        p.error(f"unknown document(s): {', '.join(sorted(unknown))}")
+    return args
+
+
+def select(args):
+    names = [j.name for j in JOBS] if args.all else (args.docs or DEFAULT)
+    return [j for j in JOBS if j.name in names]
+
+
+def build(args, jobs, workers, force=False, split_halves=None):
+    """Build `jobs` as the options say (`split_halves`, when given, overrides
+    --split-halves), print the reports; returns the exit status."""
+    if args.dry_run:
+        print("Laying out Bazary legal documents (dry run, nothing is written)...\n")
+    else:
+        print("Generating Bazary legal documents (law firm style)...\n")
+    threads = args.threads or max(1, (os.cpu_count() or 1) // max(1, min(workers, len(jobs))))
+    reproducible = args.reproducible or "SOURCE_DATE_EPOCH" in os.environ
+    results, wall = run(jobs, workers, force=force, dry_run=args.dry_run, threads=threads,
+                        spool=args.spool, traced=bool(args.trace), profiled=args.mem_report,
+                        split_halves=args.split_halves if split_halves is None else split_halves,
+                        reproducible=reproducible)
+    report(results, wall, min(workers, len(jobs)))
+    if args.mem_report:
+        memprof.report(results)
+    if args.trace:
+        trace.save(args.trace, [e for r in results for e in r.trace or []])
+        print(f"\nTrace written to {args.trace}")
+    failed = [r.name for r in results if not r.ok]
+    if failed:
+        print(f"\n{len(failed)} of {len(results)} documents failed: {', '.join(failed)}")
+        return 1
+    if args.dry_run:
+        if report_dry_run(jobs, results):
+            print("\nLayout changed since the last build.")
+            return 2
+        print("\nLayout unchanged.")
+        return 0
+    print(f"\nAll {len(results)} documents generated successfully.")
+    return 0
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    jobs = select(args)
+    if args.check:
+        return check.main(jobs)
+    if not args.watch:
+        return build(args, jobs, args.jobs, force=args.force)
+    # One process for every build, so that fonts and layouts stay warm: no
+    # halves worker either, which would start cold and keep an edited script
+    build(args, jobs, 1, force=args.force, split_halves=False)
+    return watch.watch(jobs, lambda changed: build(args, changed, 1, split_halves=False))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+"""
+Glyph coverage check (--check).
+
+    python generate-legal-pdfs.py --all --check
+
+Runs the generators with fpdf's text sinks (cell, multi_cell, text,
+write, start_section) replaced by a recorder and output() by a no-op, so
+nothing is measured, laid out or written: every string the primitives
+pass down is only checked against the coverage bitmaps (see
+pdfgen.coverage) of the document's fonts, fallbacks included. The
+Markdown sources are not rendered but checked line by line.
+
+A character none of the document's fonts maps is reported with the
+place it comes from: the Markdown file and line, else the line of the
+generator function that passed it (and the primitive it went through).
+"""
+import contextlib
+import io
+import os
+import sys
+import time
+import traceback
+
+from . import coverage, halves, markdown
+from .base import BasePDF
+
+SHOWN = 8  # characters listed per location
+
+# fpdf text sink -> position of its text argument
+SINKS = {"cell": 2, "multi_cell": 2, "text": 2, "write": 1, "start_section": 0}
+ARGS = {"cell": "text", "multi_cell": "text", "text": "text", "write": "text", "start_section": "name"}
+
+
+def _coverages(pdf):
+    return [coverage.of(f) for f in {id(f): f for f in pdf.fonts.values()}.values()
+            if getattr(f, "ttffile", None)]
+
+
+def _missing(text, covs):
+    out = []
+    for ch in set(text):
+        cp = ord(ch)
+        if cp >= 0x20 and not any(cp in c for c in covs):
+            out.append(ch)
+    return out
+
+
+class Checker:
+    """Collects {(location, char): count} while a script runs under it."""
+
+    def __init__(self, script):
+        self.script = os.path.abspath(script)
+        self.found = {}
+
+    def add(self, where, text, covs):
+        for ch in _missing(text, covs):
+            self.found[(where, ch)] = self.found.get((where, ch), 0) + 1
+
+    def _caller(self):
+        """The generator line the text comes from, and the script function
+        that passed it on when that is another one (kr(), header_static())."""
+        frames = []
+        frame = sys._getframe(2)
+        while frame is not None:
+            if os.path.abspath(frame.f_code.co_filename) == self.script:
+                frames.append(frame)
+            frame = frame.f_back
+        if not frames:
+            return "?"
+        where = f"{os.path.basename(self.script)}:{frames[-1].f_lineno}"
+        if len(frames) > 1:
+            where += f" via {frames[0].f_code.co_name}()"
+        return where
+
+    def _sink(self, name):
+        pos, kw = SINKS[name], ARGS[name]
+
+        def record(pdf, *args, **kwargs):
+            text = kwargs.get(kw, args[pos] if len(args) > pos else "")
+            if text:
+                self.add(self._caller(), str(text), _coverages(pdf))
+            return False
+        return record
+
+    def _render(self, pdf, path, only=None):
+        """Stands in for markdown.render() and halves.render(): checks the
+        lines they would render (with `only`, the front matter and that
+        section), each reported with its line number in the file."""
+        covs = _coverages(pdf)
+        with open(path, encoding="utf-8") as f:
+            numbered = list(enumerate(f, 1))
+        if only is not None:
+            front, parts = halves.sections(numbered, key=lambda item: item[1])
+            numbered = front + parts[only]
+        for n, line in numbered:
+            self.add(f"{os.path.basename(path)}:{n}", line.rstrip("\r\n"), covs)
+
+    @staticmethod
+    def _width(pdf, s, *args, **kwargs):
+        return len(s) * pdf.font_size / 2  # tables need some width; nothing is drawn
+
+    @contextlib.contextmanager
+    def installed(self):
+        patched = {name: self._sink(name) for name in SINKS}
+        patched["get_string_width"] = self._width
+        patched["output"] = lambda pdf, *args, **kwargs: None
+        saved = {name: BasePDF.__dict__.get(name) for name in patched}
+        saved_render = markdown.render, halves.render
+        for name, func in patched.items():
+            setattr(BasePDF, name, func)
+        markdown.render = halves.render = self._render
+        try:
+            yield self
+        finally:
+            markdown.render, halves.render = saved_render
+            for name, func in saved.items():
+                if func is None:
+                    delattr(BasePDF, name)
+                else:
+                    setattr(BasePDF, name, func)
+
+
+def check_job(job):
+    """(seconds, {(location, char): count}, error) of one document."""
+    from .build import load_script  # build imports this module
+    t0 = time.perf_counter()
+    try:
+        mod = load_script(job.script)
+        checker = Checker(mod.__file__)
+        with checker.installed(), contextlib.redirect_stdout(io.StringIO()):
+            getattr(mod, job.func)()
+        return time.perf_counter() - t0, checker.found, None
+    except Exception:
+        return time.perf_counter() - t0, {}, traceback.format_exc()
+
+
+def _order(where):
+    name, _, rest = where.partition(":")
+    line = rest.split()[0]
+    return name, int(line) if line.isdigit() else 0
+
+
+def main(jobs):
+    """Check every job; returns the exit status (1 when a glyph is missing)."""
+    print("Checking glyph coverage (nothing is laid out or written)...\n")
+    status = 0
+    t0 = time.perf_counter()
+    for job in jobs:
+        seconds, found, error = check_job(job)
+        if error:
+            status = 1
+            print(f"  {job.name:<10} {seconds:6.2f}s  FAILED")
+            for line in error.rstrip().splitlines():
+                print(f"      {line}")
+            continue
+        if not found:
+            print(f"  {job.name:<10} {seconds:6.2f}s  ok")
+            continue
+        status = 1
+        by_place = {}
+        for (where, ch), count in found.items():
+            by_place.setdefault(where, []).append(ch)
+        print(f"  {job.name:<10} {seconds:6.2f}s  {len({ch for _, ch in found})} missing glyph(s)")
+        for where, chars in sorted(by_place.items(), key=lambda item: _order(item[0])):
+            chars.sort()
+            shown = ", ".join(f"{ch!r} (U+{ord(ch):04X})" for ch in chars[:SHOWN])
+            more = f", ... (and {len(chars) - SHOWN} others)" if len(chars) > SHOWN else ""
+            print(f"      {where}: {shown}{more}")
+    print(f"\nChecked in {time.perf_counter() - t0:.2f}s.")
+    return status
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""
+Glyph coverage bitmaps and per-codepoint font fallback.
+
+A Coverage is one bit per Unicode codepoint (136 KiB), set when the font
+maps it. It is built once per font file and process from the font's
+cmap (for registry fonts, the mmap'ed metrics; see pdfgen.metrics), so
+"does this font have the glyph?" is a shift and a mask instead of a
+dict lookup or a bisect.
+
+runs() splits a string over a fallback chain - the current font, then
+the fonts tried in order for what it lacks:
+
+    "Gandi.net 도메인 €12"  ->  [(0, "Gandi.net "), (1, "도메인 "), (0, "€12")]
+
+A character stays in the current run when that run's font covers it
+(spaces and punctuation do not break a Hangul run), otherwise it goes to
+the first font of the chain that does. Text none of them covers stays
+where it is and renders as fpdf's missing glyph.
+"""
+import threading
+
+SIZE = 0x110000
+
+_lock = threading.Lock()
+_bitmaps = {}  # font file -> Coverage
+
+
+class Coverage:
+    """Set of the codepoints a font maps, as a bitmap."""
+
+    def __init__(self, codepoints):
+        self.bits = bytearray(SIZE >> 3)
+        for cp in codepoints:
+            if 0 <= cp < SIZE:
+                self.bits[cp >> 3] |= 1 << (cp & 7)
+        # Plain ASCII text needs no per-character scan when all of it is there
+        self.ascii = all(self.bits[cp >> 3] >> (cp & 7) & 1 for cp in range(0x20, 0x7F))
+
+    def __contains__(self, cp):
+        return 0 <= cp < SIZE and self.bits[cp >> 3] >> (cp & 7) & 1 == 1
+
+
+def of(font):
+    """The Coverage of an fpdf TTFFont (shared by every font of that file)."""
+    key = font.ttffile
+    cov = _bitmaps.get(key)
+    if cov is None:
+        with _lock:
+            cov = _bitmaps.get(key)
+            if cov is None:
+                cov = _bitmaps[key] = Coverage(font.cmap)
+    return cov
+
+
+def runs(text, chain):
+    """Split `text` over the Coverages of `chain` into [(index, substring)]."""
+    if chain[0].ascii and text.isascii():
+        return [(0, text)]
+    bitmaps = [c.bits for c in chain]
+    found = []
+    current = 0
+    start = 0
+    for i, ch in enumerate(text):
+        cp = ord(ch)
+        byte, bit = cp >> 3, cp & 7
+        if bitmaps[current][byte] >> bit & 1:
+            continue
+        for n, bits in enumerate(bitmaps):
+            if bits[byte] >> bit & 1:
+                if i > start:
+                    found.append((current, text[start:i]))
+                current, start = n, i
+                break
+    found.append((current, text[start:]))
+    return found
@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+"""
+Process-wide font registry.
+
+Parsing "Arial Unicode.ttf" (cmap + hmtx for ~50k glyphs) is the most
+expensive step of a cold build. The registry parses each font file once
+per process and hands every document a lightweight clone that shares the
+parsed metrics, cmap and glyph ids. Only the per-document state (subset
+map, missing glyphs, font index) is fresh.
+
+fpdf subsets `font.ttfont` in place at output time, so every clone gets
+its own lazily opened TTFont handle - opening is cheap, parsing is not.
+
+Across processes the parse itself is skipped: see pdfgen.metrics.
+
+Registering a file a document already has under another style (LegalDoc
+adds FONT as both "" and "B") does not clone it again: the new style is
+an alias of the same font object, so the output embeds one subset and
+one glyph table instead of two. Both styles already drew the same
+outlines; a real bold needs a genuine bold face, which is a different
+file and gets its own font as usual.
+"""
+import copy
+import os
+import threading
+
+from fontTools import ttLib
+from fpdf.enums import TextEmphasis
+from fpdf.fonts import SubsetMap, TTFFont
+
+from . import metrics
+
+# Parsed once, shared by every clone (treated as read-only)
+_SHARED = (
+    "type", "ttffile", "is_compressed", "collection_font_number", "is_cff",
+    "is_cid_keyed", "is_symbol", "cff_ros", "scale", "cw", "cmap",
+    "glyph_ids", "name", "up", "ut", "sp", "ss", "palette_index", "unicode_range",
+)
+
+_lock = threading.Lock()
+_parsed = {}  # abs font path -> template TTFFont
+
+
+def _shareable(path):
+    """Plain outline fonts only: no colour tables, no synthesized .notdef."""
+    if os.path.splitext(path)[1].lower() not in (".ttf", ".otf"):
+        return False
+    tt = ttLib.TTFont(path, lazy=True)
+    try:
+        if any(t in tt for t in ("COLR", "SVG ", "CBDT", "sbix")):
+            return False
+        return "glyf" not in tt or ".notdef" in tt["glyf"]
+    finally:
+        tt.close()
+
+
+def _load_or_parse(pdf, path, style):
+    m = metrics.load(path)
+    if m is not None:
+        return m.template(path)
+    if not _shareable(path):
+        return None
+    tpl = TTFFont(pdf, path, "_registry", style)
+    metrics.store(path, tpl)
+    # The template's own TTFont holds fully parsed tables; clones
+    # re-open the file lazily, so release it.
+    tpl.ttfont.close()
+    tpl.ttfont = None
+    return tpl
+
+
+def _template(pdf, path, style):
+    with _lock:
+        if path not in _parsed:
+            _parsed[path] = _load_or_parse(pdf, path, style)
+        return _parsed[path]
+
+
+def _clone(tpl, pdf, fontkey, style):
+    font = TTFFont.__new__(TTFFont)
+    for attr in _SHARED:
+        if hasattr(tpl, attr):
+            setattr(font, attr, getattr(tpl, attr))
+    font.i = len(pdf.fonts) + 1
+    # A PDF object: output assigns it an object id, so never share it
+    font.desc = copy.copy(tpl.desc)
+    font.fontkey = fontkey
+    font.emphasis = TextEmphasis.coerce(style)
+    font.ttfont = ttLib.TTFont(font.ttffile, recalcTimestamp=False,
+                               fontNumber=font.collection_font_number, lazy=True)
+    if font.is_compressed:
+        font.ttfont.flavor = None
+    font._hbfont = None
+    font.biggest_size_pt = 0
+    font.missing_glyphs = []
+    font.subset = SubsetMap(font)
+    font.color_font = None
+    return font
+
+
+def _registered(pdf, path):
+    """The font of `pdf` already loaded from `path`, if any."""
+    for font in pdf.fonts.values():
+        if getattr(font, "ttffile", None) and os.path.abspath(font.ttffile) == path:
+            return font
+    return None
+
+
+def add_font(pdf, family, style, fname):
+    """Register `fname` on `pdf` from the registry.
+
+    Returns False when the font cannot be shared (colour fonts, WOFF, ...);
+    the caller then falls back to `FPDF.add_font`.
+    """
+    path = os.path.abspath(fname)
+    if not os.path.isfile(path):
+        return False
+    style = "".join(sorted(style.upper()))
+    fontkey = f"{family.lower()}{style}"
+    if fontkey in pdf.fonts:
+        return True
+    font = _registered(pdf, path)
+    if font is not None:
+        pdf.fonts[fontkey] = font
+        return True
+    tpl = _template(pdf, path, style)
+    if tpl is None:
+        return False
+    font = _clone(tpl, pdf, fontkey, style)
+    pdf.fonts[fontkey] = font
+    if font.is_cff and font.is_cid_keyed:
+        pdf._set_min_pdf_version("1.6")
+    return True
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""
+Form XObjects for the static part of page headers and footers.
+
+The first time a block is drawn its operators are captured from the page
+content stream into a Form XObject; that page and every later one only
+get "/In Do". `Do` saves and restores the graphics state around the form,
+so fpdf's own idea of the current font / colours / line width is rolled
+back to what it was before the block, and the cursor is left where the
+block left it. The captured block sets all of its own state, so it does
+not depend on the page it was first drawn on.
+
+The form is registered with fpdf's resource catalog the same way fpdf
+registers its own (blend group) forms, so it is numbered, written and
+listed in the page /Resources by the normal output path.
+"""
+from fpdf.enums import PDFResourceType
+from fpdf.syntax import Name, PDFArray, PDFContentStream
+
+
+class _FormResources:
+    """Builds the form's /Resources once fpdf has numbered the fonts.
+
+    fpdf's output calls get_resource_dictionary() on the `_blend_group`
+    of every registered form XObject."""
+
+    def __init__(self, found):
+        self.found = found
+
+    def get_resource_dictionary(self, gfxstate_objs_per_name, pattern_objs_per_name,
+                                shading_objs_per_name, font_objs_per_index, img_objs_per_index):
+        fonts = sorted(int(i) for t, i in self.found if t == PDFResourceType.FONT)
+        states = sorted(n for t, n in self.found if t == PDFResourceType.EXT_G_STATE)
+        parts = []
+        if fonts:
+            parts.append("/Font <<" + "".join(
+                f"/F{i} {font_objs_per_index[i].id} 0 R" for i in fonts) + ">>")
+        if states:
+            parts.append("/ExtGState <<" + "".join(
+                f"/{n} {gfxstate_objs_per_name[n].id} 0 R" for n in states) + ">>")
+        return "<<" + "".join(parts) + ">>"
+
+
+def _register(pdf, contents):
+    catalog = pdf._resource_catalog
+    xobject = PDFContentStream(contents=contents, compress=pdf.compress)
+    xobject.type = Name("XObject")
+    xobject.subtype = Name("Form")
+    xobject.b_box = PDFArray([0, 0, round(pdf.w_pt, 2), round(pdf.h_pt, 2)])
+    xobject._registered = False
+    xobject._blend_group = _FormResources(catalog.scan_stream(contents.decode("latin-1")))
+    index = catalog.next_xobject_index
+    catalog.next_xobject_index += 1
+    catalog.form_xobjects.append((index, xobject))
+    return index
+
+
+def draw(pdf, name, paint):
+    """Paint the static block `name` with `paint()` on the current page,
+    capturing it into a form XObject on first use."""
+    form = pdf._forms.get(name)
+    if form is None:
+        state = pdf._get_current_graphics_state()
+        font_set = pdf.current_font_is_set_on_page
+        contents = pdf.pages[pdf.page].contents
+        start = len(contents)
+        # The form is painted over whatever state each page is in: make fpdf
+        # emit every setting the block relies on instead of skipping the
+        # ones that happen to be current on this page.
+        pdf.line_width = -1
+        pdf.draw_color = pdf.fill_color = None
+        pdf.current_font_is_set_on_page = False
+        paint()
+        captured = bytes(contents[start:])
+        del contents[start:]
+        form = pdf._forms[name] = (_register(pdf, captured), pdf.x, pdf.y)
+        pdf._pop_local_stack()
+        pdf._push_local_stack(new=state)
+        pdf.current_font_is_set_on_page = font_set
+    index, x, y = form
+    pdf._out(f"/I{index} Do")
+    pdf._resource_catalog.add(PDFResourceType.X_OBJECT, index, pdf.page)
+    pdf.x, pdf.y = x, y
@@ -0,0 +1,313 @@
+# -*- coding: utf-8 -*-
+"""
+Bilingual documents laid out as two halves in parallel.
+
+The Terms of Use and the Privacy Policy are an English version and a
+French version, each opened by a top-level "# " heading (a new page).
+Nothing flows from one into the other but the page numbers, so while
+the document renders the cover and the first half, a worker process
+renders the last "# " section on its own document of the same class:
+
+    parent   cover, English ........... | append French pages
+    worker   French ...............     |
+
+The worker's document is started as a continuation: page_no() counts
+from 2 so the header is laid out on its first page, but the header and
+footer are not kept (only their effect on the cursor) - the parent
+draws its own on every appended page, with the real page number, and
+fpdf substitutes {nb} over the whole document at output.
+
+The worker returns its page content streams, the glyphs behind the
+subset codes of its fonts and its static blocks (see pdfgen.forms).
+Appending a page rewrites the stream into the parent's resources:
+
+    /F3 9 Tf     the parent's font of the same name
+    (...) Tj     each 2-byte code re-picked from the parent's subset,
+                 so both halves share one embedded subset per font
+    /I1 Do       the parent's form of the same static block
+
+and wraps it in q ... Q over a reset graphics state. A half using
+anything else (links, outline, images, graphics states) is rendered
+again in the parent, after the first half, as before.
+
+The split is off by default (`parallel = False`): a whole document lays
+out in ~0.1s, less than a worker takes to start under spawn, and a build
+already renders its documents in parallel processes. When it is on
+(--split-halves), each process keeps one worker for all its documents,
+so only the first pays for the start; the worker is shut down when the
+process exits.
+
+Without the split (or with one CPU), both halves are rendered in the parent, one after
+the other. A reproducible document (see
+BasePDF.reproducible) still lays its last section out as a continuation
+and appends it, only in the parent: its bytes are the same with or
+without a worker.
+"""
+import os
+import re
+import sys
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import util
+
+from fpdf.enums import PDFResourceType
+from fpdf.fonts import TTFFont
+from fpdf.util import escape_parens
+
+from . import forms, layout, markdown, streams
+
+# True: in parallel when the machine has more than one CPU
+parallel = False
+
+# The worker's stream assumes the initial graphics and text state
+RESET = b"q 0 G 0 g [] 0 d 0 Tc 0 Tw 100 Tz 0 TL 0 Tr 0 Ts"
+
+_ESCAPE = re.compile(rb"\\(.)", re.S)
+
+_pool = None  # (pid, the halves worker of that process)
+
+
+class Unsupported(Exception):
+    """The half uses something the merge does not carry over."""
+
+
+def sections(lines, key=None):
+    """(front matter, [each top-level "# " section]) of Markdown `lines`
+    (of items whose `key` is the line, with `key`)."""
+    starts = [i for i, item in enumerate(lines) if (key(item) if key else item).startswith("# ")]
+    if starts and starts[0] == 0:
+        starts = starts[1:]  # the front matter title
+    if not starts:
+        return lines, []
+    bounds = starts + [len(lines)]
+    return lines[:starts[0]], [lines[a:b] for a, b in zip(bounds, bounds[1:])]
+
+
+def split(lines):
+    """(first half, last "# " section) of Markdown `lines`; the second is
+    empty when there is a single top-level section."""
+    front, parts = sections(lines)
+    if len(parts) < 2:
+        return lines, []
+    return front + [line for part in parts[:-1] for line in part], parts[-1]
+
+
+def _enabled():
+    return parallel and (os.cpu_count() or 1) > 1
+
+
+def _worker():
+    """The halves worker of this process, started on first use. It is
+    shut down before multiprocessing waits for the children of a build
+    worker (see pdfgen.build), which would otherwise never exit."""
+    global _pool
+    if _pool is None or _pool[0] != os.getpid():  # not one inherited by fork
+        pool = ProcessPoolExecutor(max_workers=1)
+        # Before the finalizers of its queues (priority 10) stop feeding it
+        util.Finalize(None, pool.shutdown, exitpriority=100)
+        _pool = os.getpid(), pool
+    return _pool[1]
+
+
+def _script(pdf):
+    """File name of the generator script defining the document class, if
+    load_script() can import it again in a worker."""
+    path = getattr(sys.modules.get(type(pdf).__module__), "__file__", None)
+    from .build import ROOT  # build imports the scripts, which import this module
+    if not path or os.path.dirname(os.path.abspath(path)) != ROOT:
+        return None
+    return os.path.basename(path)
+
+
+def render(pdf, source, only=None):
+    """markdown.render() of a file with several top-level sections, the
+    last one laid out in a worker process and appended (see above).
+    With `only`, just the front matter and that section (by index)."""
+    with open(source, encoding="utf-8") as f:
+        lines = f.readlines()
+    if only is not None:
+        front, parts = sections(lines)
+        markdown.render(pdf, front + parts[only])
+        return
+    first, last = split(lines)
+    args = pdf.continuation_args()
+    script = _script(pdf)
+    if not last or args is None or script is None or not (_enabled() or pdf.reproducible):
+        markdown.render(pdf, lines)
+        return
+    if not _enabled():
+        markdown.render(pdf, first)
+        _append(pdf, lambda: _laid_out(type(pdf), args, last), last)
+        return
+    global _pool
+    try:
+        future = _worker().submit(_second_half, script, type(pdf).__name__, args, last)
+        markdown.render(pdf, first)
+        _append(pdf, future.result, last)
+    except BrokenProcessPool:
+        _pool = None  # a new worker for the next document
+        raise
+
+
+def _append(pdf, half, lines):
+    """append() the continuation `half()`, or render `lines` again when
+    it uses something the merge does not carry over."""
+    try:
+        append(pdf, half())
+    except Unsupported:
+        markdown.render(pdf, lines, front_matter=False)
+
+
+# --- worker -------------------------------------------------------------
+
+def _continue(pdf):
+    """Make `pdf` lay out as the pages that follow another document."""
+    pdf.page_no = lambda: pdf.page + 1
+    pdf.footer = lambda: None
+    header = pdf.header
+
+    def header_for_the_cursor():
+        state = pdf._get_current_graphics_state()
+        font_set = pdf.current_font_is_set_on_page
+        contents = pdf.pages[pdf.page].contents
+        start = len(contents)
+        header()
+        del contents[start:]
+        pdf._pop_local_stack()
+        pdf._push_local_stack(new=state)
+        pdf.current_font_is_set_on_page = font_set
+    pdf.header = header_for_the_cursor
+
+
+def _laid_out(cls, args, lines):
+    """export() of `lines` laid out on a continuation document of `cls`."""
+    from .base import BasePDF
+    spool, BasePDF.spool = BasePDF.spool, False  # pages are sent back, not written
+    try:
+        pdf = cls(*args)
+    finally:
+        BasePDF.spool = spool
+    _continue(pdf)
+    markdown.render(pdf, lines, front_matter=False)
+    return export(pdf)
+
+
+def _second_half(script, cls_name, args, lines):
+    from .build import load_script
+    half = _laid_out(getattr(load_script(script), cls_name), args, lines)
+    layout.save()
+    return half
+
+
+def export(pdf):
+    """The pages of a continuation document, as a picklable dict."""
+    if pdf._outline or pdf.image_cache.images or any(p.annots for p in pdf.pages.values()):
+        raise Unsupported("links, outline or images")
+    catalog = pdf._resource_catalog
+    names = {index: name for name, (index, _, _) in pdf._forms.items()}
+    pages, used = [], set()
+    for n in range(1, pdf.pages_count + 1):
+        page = pdf.pages[n]
+        if page.dimensions() != pdf.pages[1].dimensions():
+            raise Unsupported("page format")
+        contents = bytes(page.contents)
+        for kind, ident in catalog.scan_stream(contents.decode("latin-1")):
+            if kind == PDFResourceType.X_OBJECT and int(ident) in names:
+                used.add(int(ident))
+            elif kind != PDFResourceType.FONT:
+                raise Unsupported(f"{kind.name} resource")
+        pages.append(contents)
+    static = {}
+    for index, xobject in catalog.form_xobjects:
+        if index in used:
+            name = names[index]
+            contents = xobject._contents
+            if xobject.filter is not None:
+                contents = zlib.decompress(contents)
+            static[index] = (name, bytes(contents), pdf._forms[name][1], pdf._forms[name][2])
+    fonts, glyphs, missing = {}, {}, {}
+    for key, font in pdf.fonts.items():
+        if font.i in fonts:
+            continue
+        fonts[font.i] = key
+        if isinstance(font, TTFFont):
+            glyphs[font.i] = {code: glyph for glyph, code in font.subset.items() if glyph is not None}
+            missing[font.i] = list(font.missing_glyphs)
+    return {"pages": pages, "fonts": fonts, "glyphs": glyphs, "missing": missing,
+            "forms": static, "xy": (pdf.x, pdf.y),
+            "anchors": [(kind, text, page - 1) for kind, text, page in pdf.anchors]}
+
+
+# --- parent -------------------------------------------------------------
+
+def _unescape(literal):
+    return _ESCAPE.sub(lambda m: b"\r" if m.group(1) == b"r" else m.group(1), literal[1:-1])
+
+
+def _recode(literal, glyphs, font):
+    data = _unescape(literal)
+    codes = []
+    for i in range(0, len(data) - 1, 2):
+        code = data[i] << 8 | data[i + 1]
+        glyph = glyphs.get(code)
+        codes.append(chr(code if glyph is None else font.subset.pick_glyph(glyph)))
+    text = "".join(codes).encode("utf-16-be").decode("latin-1")
+    return b"(" + escape_parens(text).encode("latin-1") + b")"
+
+
+def _remap(data, half, fonts, xobjects):
+    """Rewrite a content stream of the worker into the parent's font
+    indices, subset codes and form indices."""
+    out = bytearray()
+    tokens = []  # since the last operator
+    font = glyphs = None
+    saved = []  # (font, glyphs) at each q
+    for m in streams._TOKEN.finditer(data):
+        if m.lastgroup != "op":
+            tokens.append(m.group())
+            continue
+        op = m.group()
+        if op == b"q":
+            saved.append((font, glyphs))
+        elif op == b"Q" and saved:
+            font, glyphs = saved.pop()
+        elif op == b"Tf":
+            i = int(next(t for t in tokens if t.startswith(b"/F"))[2:])
+            font, glyphs = fonts[i], half["glyphs"].get(i)
+            tokens = [b"/F%d" % font.i if t.startswith(b"/F") else t for t in tokens]
+        elif op == b"Do":
+            tokens = [b"/I%d" % xobjects[int(t[2:])] if t.startswith(b"/I") else t for t in tokens]
+        elif glyphs is not None:
+            tokens = [_recode(t, glyphs, font) if t.startswith(b"(") else t for t in tokens]
+        out += b"".join(tokens) + op
+        tokens = []
+    out += b"".join(tokens)
+    return bytes(out)
+
+
+def append(pdf, half):
+    """Add the pages of an export()ed continuation after the current page."""
+    missing = set(half["fonts"].values()) - set(pdf.fonts)
+    if missing:
+        raise Unsupported(f"fonts {sorted(missing)}")
+    fonts = {i: pdf.fonts[key] for i, key in half["fonts"].items()}
+    for i, cps in half["missing"].items():
+        fonts[i].missing_glyphs.extend(cp for cp in cps if cp not in fonts[i].missing_glyphs)
+    xobjects = {}
+    for index, (name, contents, x, y) in half["forms"].items():
+        if name not in pdf._forms:
+            pdf._forms[name] = (forms._register(pdf, _remap(contents, half, fonts, {})), x, y)
+        xobjects[index] = pdf._forms[name][0]
+    first = pdf.page
+    catalog = pdf._resource_catalog
+    for contents in half["pages"]:
+        pdf.add_page()
+        body = _remap(contents, half, fonts, xobjects)
+        pdf._out(RESET)
+        pdf._out(body)
+        pdf._out("Q")
+        for kind, ident in catalog.scan_stream(body.decode("latin-1")):
+            catalog.add(kind, int(ident), pdf.page)
+    pdf.anchors.extend((kind, text, first + page) for kind, text, page in half["anchors"])
+    pdf.x, pdf.y = half["xy"]
@@ -0,0 +1,231 @@
+# -*- coding: utf-8 -*-
+"""
+Line-breaking cache for multi_cell().
+
+Every LegalDoc / PDF primitive wraps its text with multi_cell(), which
+measures it character by character. The same strings come back often
+(contact lines, disclaimers, the EN and FR boilerplate, every rebuild of
+an unchanged paragraph), so the computed lines are cached under
+
+    (font file, style, size, spacing, width, alignment, text)
+
+as character spans plus the widths and heights fpdf derived for them. A
+hit rebuilds the TextLines from the spans without measuring anything.
+
+The cache is a bounded LRU and, when CACHE_DIR is set, is persisted to
+disk between runs (see save()). Only multi_cell() calls made through
+BasePDF use it; fpdf's other MultiLineBreak users are left alone.
+"""
+import contextlib
+import contextvars
+import json
+import os
+from collections import OrderedDict
+
+import fpdf
+import fpdf.fpdf
+from fpdf.enums import Align, WrapMode
+from fpdf.line_break import MultiLineBreak, TextLine
+
+from . import CACHE_DIR
+
+VERSION = 1
+MAXSIZE = 20000
+
+_active = contextvars.ContextVar("bazary_line_cache", default=None)
+_font_ids = {}  # font file -> (path, size, mtime) for the cache key
+
+
+def _font_id(font):
+    path = getattr(font, "ttffile", None)
+    if not path:
+        return [font.fontkey]  # core font
+    fid = _font_ids.get(path)
+    if fid is None:
+        try:
+            st = os.stat(path)
+            fid = [os.path.abspath(path), st.st_size, st.st_mtime_ns]
+        except OSError:
+            fid = [path]
+        _font_ids[path] = fid
+    return fid
+
+
+class LineCache:
+    """LRU of wrapped lines with hit/miss counters."""
+
+    def __init__(self, maxsize=MAXSIZE, path=None):
+        self.maxsize = maxsize
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._lines = OrderedDict()
+        self._used = set()  # keys looked up or stored since the last save
+        self._loaded = False
+        self._dirty = False
+
+    def get(self, key):
+        self._load()
+        entry = self._lines.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._lines.move_to_end(key)
+        self._used.add(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key, entry):
+        self._lines[key] = entry
+        self._lines.move_to_end(key)
+        self._used.add(key)
+        while len(self._lines) > self.maxsize:
+            self._lines.popitem(last=False)
+        self._dirty = True
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._lines)}
+
+    def _load(self):
+        if self._loaded:
+            return
+        self._loaded = True
+        if not self.path:
+            return
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                stored = json.load(f)
+        except (OSError, ValueError):
+            return
+        # Loaded before the first lookup, so nothing newer is lost
+        self._lines.update(stored)
+
+    def save(self):
+        """Write the cache to disk, merged with what other processes stored."""
+        if not self.path or not self._dirty:
+            return
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                merged = json.load(f)
+        except (OSError, ValueError):
+            merged = {}
+        # The lines this run used become the most recent, in the order it
+        # last used them, so the truncation below drops the oldest ones
+        for key, entry in self._lines.items():
+            if key in self._used:
+                merged.pop(key, None)
+                merged[key] = entry
+        items = list(merged.items())[-self.maxsize:]
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(dict(items), f, ensure_ascii=False, separators=(",", ":"))
+            os.replace(tmp, self.path)
+            self._dirty = False
+            self._used.clear()
+        except OSError:
+            pass  # the cache is only an optimization
+
+
+cache = LineCache(path=CACHE_DIR and os.path.join(
+    CACHE_DIR, "layout", f"lines-v{VERSION}-fpdf{fpdf.__version__}.json"))
+
+
+@contextlib.contextmanager
+def cached(line_cache=None):
+    """Serve the MultiLineBreak of multi_cell() calls in this block from the cache."""
+    token = _active.set(line_cache or cache)
+    try:
+        yield
+    finally:
+        _active.reset(token)
+
+
+def _key(fragments, max_width, margins, align, print_sh, wrapmode, line_height, indent):
+    frags = [[_font_id(f.font), f.font_style, f.font_size_pt, f.char_spacing,
+              f.font_stretching, f.k, "".join(f.characters)] for f in fragments]
+    return json.dumps([frags, max_width, list(margins), align.value, print_sh,
+                       wrapmode.value, line_height, indent], ensure_ascii=False)
+
+
+class CachingLineBreak(MultiLineBreak):
+    """MultiLineBreak that replays / records lines while a cache is active."""
+
+    def __init__(self, fragments, max_width, margins, align=Align.L, print_sh=False,
+                 wrapmode=WrapMode.WORD, line_height=1.0,
+                 skip_leading_spaces=False, first_line_indent=0):
+        super().__init__(fragments, max_width, margins, align=align, print_sh=print_sh,
+                         wrapmode=wrapmode, line_height=line_height,
+                         skip_leading_spaces=skip_leading_spaces,
+                         first_line_indent=first_line_indent)
+        self._cache = _active.get()
+        self._replay = self._record = None
+        if self._cache is None or callable(max_width) or skip_leading_spaces or not fragments:
+            self._cache = None
+            return
+        self._key = _key(fragments, max_width, margins, Align.coerce(align), print_sh,
+                         WrapMode.coerce(wrapmode), line_height, first_line_indent)
+        entry = self._cache.get(self._key)
+        if entry is not None:
+            self._replay = iter(entry)
+        else:
+            self._record = []
+
+    def get_line(self):
+        if self._replay is not None:
+            spec = next(self._replay, None)
+            return None if spec is None else self._rebuild(spec)
+        start = (self.fragment_index, self.character_index)
+        line = super().get_line()
+        if self._record is not None:
+            if line is None:
+                self._cache.put(self._key, self._record)
+                self._record = None
+            else:
+                spans = self._spans(line, start)
+                if spans is None:
+                    self._record = None  # hyphenated or merged fragments: not cacheable
+                else:
+                    self._record.append([spans, line.text_width, line.number_of_spaces,
+                                         line.align.value, line.height, line.max_width,
+                                         line.trailing_nl, line.trailing_form_feed, line.indent])
+        return line
+
+    def _spans(self, line, start):
+        """[fragment index, start, end] of each line fragment in the source."""
+        fi, ci = start
+        spans = []
+        for frag in line.fragments:
+            while fi < len(self.fragments) and ci >= len(self.fragments[fi].characters):
+                fi, ci = fi + 1, 0
+            if fi == len(self.fragments):
+                return None
+            src = self.fragments[fi]
+            end = ci + len(frag.characters)
+            if src.characters[ci:end] != frag.characters or frag.link != src.link:
+                return None
+            spans.append([fi, ci, end])
+            ci = end
+        return spans
+
+    def _rebuild(self, spec):
+        spans, width, spaces, align, height, max_width, nl, ff, indent = spec
+        frags = [self.fragments[fi].clone(characters=self.fragments[fi].characters[a:b],
+                                          link=self.fragments[fi].link)
+                 for fi, a, b in spans]
+        return TextLine(frags, text_width=width, number_of_spaces=spaces,
+                        align=Align.coerce(align), height=height, max_width=max_width,
+                        trailing_nl=nl, trailing_form_feed=ff, indent=indent)
+
+
+def stats():
+    return cache.stats()
+
+
+def save():
+    cache.save()
+
+
+# multi_cell() looks MultiLineBreak up in the fpdf.fpdf namespace at call time
+fpdf.fpdf.MultiLineBreak = CachingLineBreak
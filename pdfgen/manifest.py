@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+"""
+Build manifest for incremental builds.
+
+Each output directory gets a `.bazary-build.json` recording, per document,
+the hash of everything that can change its bytes:
+- the generator function's source (its text, tables, layout calls),
+- the Markdown sources it renders (MD_* constants of the script),
+- the document class(es) and the shared pdfgen rendering code,
+- the style constants of the script (NAVY, TBL_HDR, W, TABLE_STYLE, ...),
+- the font identities (path, size, mtime) of FONT and the *_FONT fallbacks,
+- the fpdf version,
+- the creation date setting (SOURCE_DATE_EPOCH, --reproducible).
+A document whose hash matches and whose output still exists is skipped.
+The entry also keeps the document's layout (page count and heading pages)
+for the dry-run report to compare against.
+"""
+import dataclasses
+import hashlib
+import inspect
+import json
+import os
+
+import fpdf
+
+NAME = ".bazary-build.json"
+PKG = os.path.dirname(os.path.abspath(__file__))
+
+# pdfgen modules that only orchestrate builds and never change the output
+_NOT_RENDERING = {"__init__.py", "bench.py", "build.py", "check.py", "manifest.py", "memprof.py",
+                  "serve.py", "trace.py", "watch.py"}
+
+
+def _engine_files():
+    return [name for name in sorted(os.listdir(PKG))
+            if name.endswith(".py") and name not in _NOT_RENDERING]
+
+
+def _engine_source():
+    h = hashlib.sha256()
+    for name in _engine_files():
+        with open(os.path.join(PKG, name), "rb") as f:
+            h.update(name.encode() + b"\0" + f.read())
+    return h.hexdigest()
+
+
+def _constants(mod):
+    out = {}
+    for k, v in sorted(vars(mod).items()):
+        if not k.isupper():
+            continue
+        if isinstance(v, (int, float, tuple)):
+            out[k] = v
+        elif dataclasses.is_dataclass(v) and not isinstance(v, type):
+            out[k] = (type(v).__name__, dataclasses.asdict(v))  # TABLE_STYLE
+    return out
+
+
+def _font_identity(path):
+    try:
+        st = os.stat(path)
+        return [os.path.abspath(path), st.st_size, st.st_mtime_ns]
+    except OSError:
+        return [path, None, None]
+
+
+def _fonts(mod):
+    return [v for k, v in sorted(vars(mod).items())
+            if (k == "FONT" or k.endswith("_FONT")) and isinstance(v, str)]
+
+
+def _markdown_names(mod, func):
+    return sorted(n for n in getattr(mod, func).__code__.co_names if n.startswith("MD_"))
+
+
+def _markdown_sources(mod, func):
+    """Contents of the MD_* files the generator refers to."""
+    out = {}
+    for name in _markdown_names(mod, func):
+        try:
+            with open(getattr(mod, name), "rb") as f:
+                out[name] = hashlib.sha256(f.read()).hexdigest()
+        except OSError:
+            out[name] = None
+    return out
+
+
+def _date(reproducible):
+    """What the creation date of a document is made of (see BasePDF.reproducible)."""
+    epoch = os.environ.get("SOURCE_DATE_EPOCH")
+    if epoch is not None:
+        return epoch
+    return None if reproducible else "now"
+
+
+def input_hash(mod, func, reproducible=False):
+    """Hash of every input of generator `func` in script module `mod`,
+    built with BasePDF.reproducible = `reproducible`."""
+    classes = [c for c in vars(mod).values()
+               if inspect.isclass(c) and c.__module__ == mod.__name__]
+    parts = {
+        "generator": inspect.getsource(getattr(mod, func)),
+        "classes": [inspect.getsource(c) for c in sorted(classes, key=lambda c: c.__name__)],
+        "engine": _engine_source(),
+        "constants": repr(_constants(mod)),
+        "markdown": _markdown_sources(mod, func),
+        "font": [_font_identity(v) for v in _fonts(mod)],
+        "fpdf": fpdf.__version__,
+        "date": _date(reproducible),
+    }
+    return hashlib.sha256(json.dumps(parts, sort_keys=True).encode()).hexdigest()
+
+
+def input_files(mod, func):
+    """The files input_hash() reads: the script, the pdfgen directory and
+    rendering modules, the Markdown sources and the fonts."""
+    return ([mod.__file__, PKG] + [os.path.join(PKG, n) for n in _engine_files()]
+            + [getattr(mod, n) for n in _markdown_names(mod, func)] + _fonts(mod))
+
+
+def stamp(paths):
+    """(size, mtime) of each of `paths`, None for a missing one: a cheap
+    check that input_hash() is unchanged without reading anything."""
+    out = []
+    for path in paths:
+        try:
+            st = os.stat(path)
+            out.append((st.st_size, st.st_mtime_ns))
+        except OSError:
+            out.append(None)
+    return tuple(out)
+
+
+def _path(out):
+    return os.path.join(os.path.dirname(os.path.abspath(out)), NAME)
+
+
+def load(out):
+    """Manifest entries of the directory `out` is written to."""
+    try:
+        with open(_path(out)) as f:
+            return json.load(f).get("docs", {})
+    except (OSError, ValueError):
+        return {}
+
+
+def up_to_date(name, out, digest):
+    entry = load(out).get(name)
+    return bool(entry) and entry.get("hash") == digest and os.path.exists(out)
+
+
+def record(name, out, digest, layout=None):
+    """Store the hash (and layout) of a freshly written document."""
+    docs = load(out)
+    docs[name] = {"hash": digest, "out": os.path.basename(out)}
+    if layout:
+        docs[name]["layout"] = layout
+    path = _path(out)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump({"version": 1, "docs": docs}, f, indent=2, sort_keys=True)
+        f.write("\n")
+    os.replace(tmp, path)
@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+"""
+Streaming Markdown -> LegalDoc renderer for the Bazary_*_EN_FR.md sources.
+
+The file is consumed line by line; only the current paragraph is buffered
+and table rows are handed to `LegalDoc.table()` as they are read, so memory
+does not grow with the document.
+
+    # Title            section_title (new page)
+    ## Title           part_title
+    ### Title          article_title
+    #### Title         sub_heading
+    **Label:**         sub_heading (a paragraph that is all bold)
+    **Label:** text    legal_note (a paragraph opening with a bold label)
+    paragraph          body; its lines are joined with a space, except
+                       after a hard break (two trailing spaces or "\\")
+    > paragraph        legal_note
+    *line*             fine_print (one per line)
+    - item             bullet
+    1. item            numbered
+    ---                separator
+    | a | b |          table; the dash counts of the |---|---| row give the
+                       relative column widths
+    <!-- comment -->   skipped
+
+A leading "# Title ... ---" block is front matter (the cover is rendered
+by the generator) and is skipped. Other `**bold**` markers are dropped:
+the legal documents use a single weight in running text. The vertical
+gaps between blocks come from the block kinds (see GAPS), so the source
+holds no layout.
+"""
+import re
+
+# Space (mm) after a list, by the kind of block that follows it
+GAPS = {"legal_note": 2}
+LIST_GAP = 1  # any other block
+_LISTS = {"bullet", "numbered"}
+
+_HEADINGS = {1: "section_title", 2: "part_title", 3: "article_title", 4: "sub_heading"}
+_HEADING = re.compile(r"^(#{1,4})\s+(.*)$")
+_BULLET = re.compile(r"^[-*]\s+(.*)$")
+_NUMBERED = re.compile(r"^(\d+)\.\s+(.*)$")
+_RULE = re.compile(r"^(-{3,}|\*{3,}|_{3,})$")
+_FINE = re.compile(r"^\*([^*].*[^*]|[^*])\*$")
+_BOLD = re.compile(r"^\*\*([^*]+)\*\*$")
+_LABEL = re.compile(r"^\*\*[^*]*:\s*\*\*")
+_TABLE_SEP = re.compile(r"^\|?(\s*:?-+:?\s*\|)+\s*:?-*:?\s*$")
+
+
+def inline(text):
+    """Strip inline emphasis markers."""
+    return text.replace("**", "")
+
+
+class _Lines:
+    """Line iterator with one line of push-back."""
+
+    def __init__(self, lines):
+        self._it = iter(lines)
+        self._back = []
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._back:
+            return self._back.pop()
+        return next(self._it).rstrip("\r\n")
+
+    def push(self, line):
+        self._back.append(line)
+
+
+def _cells(line):
+    line = line.strip()
+    if line.startswith("|"):
+        line = line[1:]
+    if line.endswith("|"):
+        line = line[:-1]
+    return [inline(c.strip()) for c in line.split("|")]
+
+
+def _skip_front_matter(lines):
+    first = next(lines, None)
+    if first is None:
+        return
+    if not first.startswith("# "):
+        lines.push(first)
+        return
+    held = [first]
+    for line in lines:
+        if _RULE.match(line.strip()):
+            return
+        if line.startswith("# "):
+            break
+        held.append(line)
+    else:
+        line = None
+    # No terminating rule before the first section: it was content after all
+    if line is not None:
+        lines.push(line)
+    for h in reversed(held):
+        lines.push(h)
+
+
+def _table_rows(lines):
+    for line in lines:
+        if not line.strip().startswith("|"):
+            lines.push(line)
+            return
+        yield _cells(line)
+
+
+def events(source, front_matter=True):
+    """Yield (kind, payload) blocks from an iterable of Markdown lines
+    (the leading front matter skipped unless `front_matter` is False).
+
+    A "table" payload holds a lazy row iterator that must be consumed
+    before the next event is requested.
+    """
+    lines = _Lines(source)
+    if front_matter:
+        _skip_front_matter(lines)
+    para = []  # (line, hard break after it)
+
+    def flush():
+        text = "".join(line + ("\n" if hard else " ") for line, hard in para).rstrip()
+        para.clear()
+        bold = _BOLD.match(text)
+        if bold:
+            return "sub_heading", bold.group(1)
+        if _LABEL.match(text):
+            return "legal_note", inline(text)
+        return "para", inline(text)
+
+    for raw in lines:
+        line = raw.strip()
+        starts_block = (not line or _HEADING.match(line) or _BULLET.match(line)
+                        or _NUMBERED.match(line) or _RULE.match(line) or line.startswith(("|", ">", "<!--"))
+                        or _FINE.match(line))
+        if para and starts_block:
+            yield flush()
+        if not line:
+            continue
+        m = _HEADING.match(line)
+        if m:
+            yield _HEADINGS[len(m.group(1))], inline(m.group(2))
+        elif _RULE.match(line):
+            yield "separator", None
+        elif _FINE.match(line):
+            yield "fine_print", inline(line[1:-1])
+        elif _BULLET.match(line):
+            yield "bullet", inline(_BULLET.match(line).group(1))
+        elif _NUMBERED.match(line):
+            m = _NUMBERED.match(line)
+            yield "numbered", (m.group(1), inline(m.group(2)))
+        elif line.startswith(">"):
+            note = [line.lstrip("> ").strip()]
+            for nxt in lines:
+                if not nxt.strip().startswith(">"):
+                    lines.push(nxt)
+                    break
+                note.append(nxt.strip().lstrip("> ").strip())
+            yield "legal_note", inline(" ".join(note))
+        elif line.startswith("<!--"):
+            continue
+        elif line.startswith("|"):
+            headers = _cells(line)
+            sep = next(lines, "")
+            if not _TABLE_SEP.match(sep.strip()):
+                raise ValueError(f"Markdown table without separator row after: {raw!r}")
+            dashes = [max(1, c.count("-")) for c in _cells(sep)]
+            yield "table", (headers, dashes, _table_rows(lines))
+        elif line.endswith("\\"):
+            para.append((line[:-1].rstrip(), True))
+        else:
+            para.append((line, raw.endswith("  ")))
+    if para:
+        yield flush()
+
+
+def render(pdf, source, front_matter=True):
+    """Render a Markdown file (path) or iterable of lines onto a LegalDoc;
+    `front_matter=False` for lines that start in the middle of a file."""
+    if isinstance(source, str):
+        with open(source, encoding="utf-8") as f:
+            return render(pdf, f, front_matter)
+    prev = None
+    for kind, payload in events(source, front_matter):
+        if prev in _LISTS and kind not in _LISTS:
+            pdf.ln(GAPS.get(kind, LIST_GAP))
+        prev = kind
+        if kind == "para":
+            pdf.body(payload)
+        elif kind == "numbered":
+            pdf.numbered(*payload)
+        elif kind == "separator":
+            pdf.separator()
+        elif kind == "table":
+            headers, dashes, rows = payload
+            total = sum(dashes)
+            widths = [pdf.W * d / total for d in dashes]
+            pdf.table(headers, rows, col_widths=widths)
+        else:
+            getattr(pdf, kind)(payload)
+    if prev in _LISTS:
+        pdf.ln(LIST_GAP)
@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+"""
+Per-document memory profile (--mem-report).
+
+A build job runs under tracemalloc, split into three phases:
+
+    font load   from the start of the job to the first add_page()
+                (document construction, add_font)
+    layout      from there to output()
+    output      output() itself: serialization, font subsetting, writing
+
+For each phase the report gives the peak traced memory, what the phase
+left allocated and the allocation sites that grew the most. The process
+peak RSS is added from getrusage(); with a process pool it is the peak
+of the worker, across all the jobs it ran.
+
+Fonts are shared by every document of a process (see pdfgen.fonts): a
+document built after another one in the same worker shows no font load.
+"""
+import functools
+import sys
+import tracemalloc
+
+from .base import BasePDF
+
+TOP = 5      # allocation sites reported per phase
+FRAMES = 1   # traceback depth kept by tracemalloc
+PHASES = ["font load", "layout", "output"]
+
+_active = None
+
+
+def _kib(n):
+    return round(n / 1024)
+
+
+def _site(frame):
+    parts = frame.filename.replace("\\", "/").split("/")
+    return f"{'/'.join(parts[-2:])}:{frame.lineno}"
+
+
+class Profile:
+    """tracemalloc peaks and top sites of the phases of one job."""
+
+    def __init__(self):
+        self.phases = []
+        self.name = None
+        self._snapshot = None
+        self._current = 0
+
+    def start(self):
+        tracemalloc.start(FRAMES)
+        self._begin(PHASES[0])
+
+    def switch(self, name):
+        if name != self.name and PHASES.index(name) > PHASES.index(self.name):
+            self._end()
+            self._begin(name)
+
+    def stop(self):
+        self._end()
+        tracemalloc.stop()
+        return {"peak_kib": max((p["peak_kib"] for p in self.phases), default=0),
+                "max_rss_kib": max_rss_kib(), "phases": self.phases}
+
+    def _take(self):
+        return tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+        ])
+
+    def _begin(self, name):
+        self.name = name
+        self._snapshot = self._take()
+        self._current = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+
+    def _end(self):
+        current, peak = tracemalloc.get_traced_memory()
+        grown = [s for s in self._take().compare_to(self._snapshot, "lineno") if s.size_diff > 0]
+        self.phases.append({
+            "name": self.name,
+            "peak_kib": _kib(peak),
+            "retained_kib": _kib(current - self._current),
+            "top": [[_site(s.traceback[0]), _kib(s.size_diff)] for s in grown[:TOP]],
+        })
+
+
+def max_rss_kib():
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(rss / 1024) if sys.platform == "darwin" else rss  # bytes on macOS
+
+
+def _phase(name, method):
+    if getattr(method, "_phase", None):
+        return method
+
+    @functools.wraps(method)
+    def switching(self, *args, **kwargs):
+        if _active is not None:
+            _active.switch(name)
+        return method(self, *args, **kwargs)
+    switching._phase = name
+    return switching
+
+
+def instrument_module(mod):
+    """Mark the phase boundaries on every document class of a script."""
+    for obj in list(vars(mod).values()):
+        if isinstance(obj, type) and issubclass(obj, BasePDF) and obj is not BasePDF:
+            obj.add_page = _phase("layout", obj.add_page)
+            obj.output = _phase("output", obj.output)
+
+
+def start():
+    global _active
+    _active = Profile()
+    _active.start()
+
+
+def stop():
+    """End the profile started by start(); returns it as a dict."""
+    global _active
+    profile, _active = _active, None
+    return profile.stop()
+
+
+def report(results):
+    """Print the memory profile of each document."""
+    print("\nMemory (tracemalloc peak per phase, top allocation sites):")
+    for r in results:
+        m = r.memory
+        if not m:
+            continue
+        rss = f", process max RSS {m['max_rss_kib'] / 1024:.1f} MiB" if m.get("max_rss_kib") else ""
+        print(f"\n  {r.name:<10} peak {m['peak_kib'] / 1024:.1f} MiB{rss}")
+        for p in m["phases"]:
+            print(f"    {p['name']:<10} peak {p['peak_kib'] / 1024:7.1f} MiB"
+                  f"   retained {p['retained_kib'] / 1024:+7.1f} MiB")
+            for site, kib in p["top"]:
+                print(f"        {kib / 1024:7.2f} MiB  {site}")
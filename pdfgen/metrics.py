@@ -0,0 +1,265 @@
+# -*- coding: utf-8 -*-
+"""
+Precompiled font metrics cache.
+
+The first run parses the font as usual and writes a compact binary file
+(advances, cmap, glyph ids and names) under CACHE_DIR. Later
+runs mmap that file instead of touching the TTF: nothing is decoded up
+front, lookups bisect the sorted codepoint array and memoize the answer.
+
+Cache files are named after the font's SHA-256; a small per-file ref keyed
+by (path, size, mtime) skips hashing 23 MB on every start.
+
+Layout (native byte order, 8-byte aligned sections):
+    b"BZFM" | u32 header length | header JSON | codepoints u32[n]
+    | glyph ids u32[n] | widths i32[n] | name offsets u32[n+1] | names
+"""
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from collections.abc import Mapping
+
+from fpdf.enums import FontDescriptorFlags
+from fpdf.fonts import PDFFontDescriptor, TTFFont
+
+from . import CACHE_DIR
+
+MAGIC = b"BZFM"
+VERSION = 1
+
+# Scalar TTFFont attributes stored in the header
+_ATTRS = ("type", "name", "scale", "up", "ut", "sp", "ss", "is_compressed", "is_cff",
+          "is_cid_keyed", "is_symbol", "cff_ros", "collection_font_number", "palette_index")
+_DESC = ("ascent", "descent", "cap_height", "font_b_box", "italic_angle", "stem_v",
+         "missing_width")
+
+
+def _sha256(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _ref_path(path):
+    st = os.stat(path)
+    key = f"{os.path.abspath(path)}|{st.st_size}|{st.st_mtime_ns}"
+    return os.path.join(CACHE_DIR, "fonts", hashlib.sha1(key.encode()).hexdigest() + ".ref")
+
+
+def _metrics_path(digest):
+    return os.path.join(CACHE_DIR, "fonts", digest + ".fm")
+
+
+def _atomic_write(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+# --- Lazy views over the mmap ---
+class _Index:
+    """Sorted codepoint array -> row number, memoized."""
+
+    def __init__(self, codepoints):
+        self.cps = codepoints
+        self.rows = {}
+
+    def row(self, cp):
+        r = self.rows.get(cp)
+        if r is None:
+            i = bisect_left(self.cps, cp)
+            r = i if i < len(self.cps) and self.cps[i] == cp else -1
+            self.rows[cp] = r
+        return r
+
+
+class LazyCmap(Mapping):
+    """codepoint -> glyph name"""
+
+    def __init__(self, index, name_offsets, names):
+        self._index = index
+        self._offsets = name_offsets
+        self._names = names
+        self._memo = {}
+
+    def __getitem__(self, cp):
+        name = self._memo.get(cp)
+        if name is None:
+            r = self._index.row(cp)
+            if r < 0:
+                raise KeyError(cp)
+            name = bytes(self._names[self._offsets[r]:self._offsets[r + 1]]).decode()
+            self._memo[cp] = name
+        return name
+
+    def __contains__(self, cp):
+        return cp in self._memo or self._index.row(cp) >= 0
+
+    def __iter__(self):
+        return iter(self._index.cps)
+
+    def __len__(self):
+        return len(self._index.cps)
+
+
+class LazyGlyphIds(Mapping):
+    """codepoint -> glyph id"""
+
+    def __init__(self, index, gids):
+        self._index = index
+        self._gids = gids
+
+    def __getitem__(self, cp):
+        r = self._index.row(cp)
+        if r < 0:
+            raise KeyError(cp)
+        return self._gids[r]
+
+    def __contains__(self, cp):
+        return self._index.row(cp) >= 0
+
+    def __iter__(self):
+        return iter(self._index.cps)
+
+    def __len__(self):
+        return len(self._index.cps)
+
+
+class LazyWidths(dict):
+    """codepoint -> advance (1/1000 em); behaves like fpdf's defaultdict."""
+
+    def __init__(self, index, widths, default):
+        super().__init__()
+        self._index = index
+        self._widths = widths
+        self.default = default
+
+    def __missing__(self, cp):
+        r = self._index.row(cp)
+        w = self._widths[r] if r >= 0 else self.default
+        self[cp] = w
+        return w
+
+
+class FontMetrics:
+    """Read-only view of one .fm file."""
+
+    def __init__(self, fm_path):
+        with open(fm_path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        mv = memoryview(self._mm)
+        if bytes(mv[:4]) != MAGIC:
+            raise ValueError(f"not a font metrics file: {fm_path}")
+        (hlen,) = struct.unpack_from("I", mv, 4)
+        self.header = json.loads(bytes(mv[8:8 + hlen]))
+        if self.header["version"] != VERSION or self.header["byteorder"] != sys.byteorder:
+            raise ValueError(f"stale font metrics file: {fm_path}")
+
+        def section(name, fmt):
+            off, size = self.header["sections"][name]
+            s = mv[off:off + size]
+            return s.cast(fmt) if fmt else s
+
+        index = _Index(section("codepoints", "I"))
+        self.cmap = LazyCmap(index, section("name_offsets", "I"), section("names", None))
+        self.glyph_ids = LazyGlyphIds(index, section("gids", "I"))
+        self.cw = LazyWidths(index, section("widths", "i"), self.header["desc"]["missing_width"])
+
+    def template(self, ttffile):
+        """A TTFFont template (no TTFont handle) for the font registry."""
+        h = self.header
+        tpl = TTFFont.__new__(TTFFont)
+        for attr in _ATTRS:
+            setattr(tpl, attr, h["attrs"][attr])
+        if tpl.cff_ros is not None:
+            tpl.cff_ros = tuple(tpl.cff_ros)
+        tpl.ttffile = ttffile
+        tpl.unicode_range = None
+        tpl.ttfont = None
+        tpl.desc = PDFFontDescriptor(flags=FontDescriptorFlags(h["desc"]["flags"]),
+                                     **{k: h["desc"][k] for k in _DESC})
+        tpl.cw, tpl.cmap, tpl.glyph_ids = self.cw, self.cmap, self.glyph_ids
+        return tpl
+
+
+# --- Build ---
+def _serialize(font, source):
+    cps = sorted(font.cmap)
+    names = bytearray()
+    offsets = array("I", [0])
+    for cp in cps:
+        names += font.cmap[cp].encode()
+        offsets.append(len(names))
+    sections = [
+        ("codepoints", array("I", cps).tobytes()),
+        ("gids", array("I", (font.glyph_ids[cp] for cp in cps)).tobytes()),
+        ("widths", array("i", (int(font.cw[cp]) for cp in cps)).tobytes()),
+        ("name_offsets", offsets.tobytes()),
+        ("names", bytes(names)),
+    ]
+    header = {
+        "version": VERSION,
+        "byteorder": sys.byteorder,
+        "source": source,
+        "attrs": {a: getattr(font, a) for a in _ATTRS},
+        "desc": dict({k: getattr(font.desc, k) for k in _DESC}, flags=font.desc.flags.value),
+        "sections": {},
+    }
+
+    def layout():
+        off = 8 + len(json.dumps(header).encode())
+        for name, data in sections:
+            off += -off % 8
+            header["sections"][name] = [off, len(data)]
+            off += len(data)
+
+    # Section offsets depend on the header length, which depends on the
+    # offsets: iterate until stable (twice in practice).
+    prev = None
+    while prev != header["sections"]:
+        prev = dict(header["sections"])
+        layout()
+    blob = json.dumps(header).encode()
+    out = bytearray(MAGIC + struct.pack("I", len(blob)) + blob)
+    for name, data in sections:
+        out += b"\0" * (header["sections"][name][0] - len(out))
+        out += data
+    return bytes(out)
+
+
+def load(path):
+    """FontMetrics for `path` from the cache, or None on a miss."""
+    if not CACHE_DIR:
+        return None
+    try:
+        with open(_ref_path(path)) as f:
+            digest = f.read().strip()
+        return FontMetrics(_metrics_path(digest))
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def store(path, font):
+    """Precompile a parsed TTFFont for later runs."""
+    if not CACHE_DIR:
+        return
+    try:
+        st = os.stat(path)
+        digest = _sha256(path)
+        fm = _metrics_path(digest)
+        if not os.path.exists(fm):
+            source = {"path": os.path.abspath(path), "size": st.st_size,
+                      "mtime_ns": st.st_mtime_ns, "sha256": digest}
+            _atomic_write(fm, _serialize(font, source))
+        _atomic_write(_ref_path(path), digest.encode())
+    except OSError:
+        pass  # read-only home, full disk...: the cache is only an optimization
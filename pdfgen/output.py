@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+"""
+Output producer used by BasePDF.output().
+
+fpdf hands the finished pages (footers drawn, table of contents inserted,
+{nb} substituted) to an OutputProducer; this one passes each page content
+stream through streams.eliminate() first. Spooled documents (see
+pdfgen.spool) have their page streams read back from, and compressed
+into, the spool one page at a time.
+
+With more than one compression thread, deflating is taken off the
+serial path: while fpdf builds its objects, every stream it would
+compress (page contents, font subsets, CID maps) is queued on a thread
+pool instead, and each result is collected when that object is written,
+so the file comes out in the usual order. zlib releases the GIL, so the
+streams really are compressed in parallel, and a font subset is deflated
+while fpdf is already subsetting the next font.
+
+A font registered under several styles (see pdfgen.fonts) is one object
+in several entries of fpdf.fonts; it is embedded once.
+
+A reproducible document (see BasePDF.reproducible) without a creation
+date gets an /Info dictionary without /CreationDate instead of fpdf's
+error.
+"""
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+import fpdf.syntax
+from fpdf.output import OutputProducer, PDFInfo, _dimensions_to_mediabox
+from fpdf.syntax import PDFContentStream, create_dictionary_string as pdf_dict
+
+from . import streams
+from .spool import FileBuffer, SpooledContents, SpooledStream
+
+
+class _Deflate:
+    """Stands in for the zlib module of fpdf.syntax during output:
+    compress() returns its input unchanged and remembers it, so that
+    Producer._add_pdf_obj() can queue the real compression."""
+
+    def __init__(self):
+        self.queued = {}  # id(raw bytes) -> (raw bytes, level)
+
+    def compress(self, data, level=-1):
+        data = bytes(data)
+        self.queued[id(data)] = (data, level)
+        return data
+
+
+class _Length:
+    """/Length of a stream whose compression is still running. Resolving
+    it (when the stream dictionary is written) swaps in the compressed
+    bytes, which fpdf writes right after the dictionary."""
+
+    def __init__(self, stream, future):
+        self.stream = stream
+        self.future = future
+
+    def serialize(self, _security_handler=None, _obj_id=None):
+        self.stream._contents = self.future.result()
+        self.stream.length = len(self.stream._contents)
+        return str(self.stream.length)
+
+
+class Producer(OutputProducer):
+    def __init__(self, fpdf):
+        for page in fpdf.pages.values():
+            if not isinstance(page.contents, SpooledContents):  # done when spooled
+                page.contents, _ = streams.eliminate(page.contents)
+        super().__init__(fpdf)
+        if getattr(fpdf, "_spool_target", None) is not None:
+            self.buffer = FileBuffer(fpdf._spool_target)
+        self.threads = getattr(fpdf, "compress_threads", 1) or 1
+        self._deflate = None
+        self._pool = None
+
+    def bufferize(self):
+        # Encrypted streams are encrypted from the compressed bytes as soon
+        # as they are written: nothing to overlap, keep fpdf's serial path.
+        if self.threads <= 1 or self.fpdf._security_handler is not None:
+            return super().bufferize()
+        self._deflate = _Deflate()
+        real_zlib, fpdf.syntax.zlib = fpdf.syntax.zlib, self._deflate
+        try:
+            with ThreadPoolExecutor(max_workers=self.threads,
+                                    thread_name_prefix="bazary-deflate") as self._pool:
+                buffer = super().bufferize()
+        finally:
+            fpdf.syntax.zlib = real_zlib
+        if self._deflate.queued:
+            raise RuntimeError(f"{len(self._deflate.queued)} stream(s) were never compressed")
+        return buffer
+
+    def _add_pdf_obj(self, pdf_obj, trace_label=None):
+        if (self._deflate is not None and isinstance(pdf_obj, PDFContentStream)
+                and pdf_obj.filter is not None):
+            queued = self._deflate.queued.pop(id(pdf_obj._contents), None)
+            if queued is not None:
+                pdf_obj.length = _Length(pdf_obj, self._pool.submit(zlib.compress, *queued))
+        return super()._add_pdf_obj(pdf_obj, trace_label)
+
+    def _add_info(self):
+        fpdf = self.fpdf
+        if fpdf.creation_date is not None:
+            return super()._add_info()
+        info_obj = PDFInfo(
+            title=fpdf.title,
+            subject=getattr(fpdf, "subject", None),
+            author=getattr(fpdf, "author", None),
+            keywords=getattr(fpdf, "keywords", None),
+            creator=getattr(fpdf, "creator", None),
+            producer=getattr(fpdf, "producer", None),
+            creation_date=None,
+        )
+        self._add_pdf_obj(info_obj)
+        return info_obj
+
+    def _add_fonts(self, *args, **kwargs):
+        catalog = self.fpdf._resource_catalog
+        fonts = catalog.font_registry
+        unique = {}
+        for key, font in fonts.items():
+            if all(font is not f for f in unique.values()):
+                unique[key] = font
+        catalog.font_registry = unique
+        try:
+            return super()._add_fonts(*args, **kwargs)
+        finally:
+            catalog.font_registry = fonts
+
+    def _add_pages(self, _slice=slice(0, None)):
+        fpdf = self.fpdf
+        spool = getattr(fpdf, "_spool", None)
+        if spool is None:
+            return super()._add_pages(_slice)
+        # fpdf's loop, with the stream read from and compressed into the spool
+        page_objs = []
+        for index in range(1, fpdf.pages_count + 1)[_slice]:
+            page_obj = fpdf.pages[index]
+            if fpdf.pdf_version > "1.3" and fpdf.allow_images_transparency:
+                page_obj.group = pdf_dict(
+                    {"/Type": "/Group", "/S": "/Transparency", "/CS": "/DeviceRGB"},
+                    field_join=" ")
+            if page_obj.dimensions() != fpdf.default_page_dimensions:
+                page_obj.media_box = _dimensions_to_mediabox(page_obj.dimensions())
+            self._add_pdf_obj(page_obj, "pages")
+            page_objs.append(page_obj)
+            contents = page_obj.contents
+            if isinstance(contents, SpooledContents):
+                contents = contents.load()
+            cs_obj = SpooledStream(spool, bytes(contents), fpdf.compress)
+            self._add_pdf_obj(cs_obj, "pages")
+            page_obj.contents = cs_obj
+        return page_objs
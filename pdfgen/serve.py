@@ -0,0 +1,582 @@
+# -*- coding: utf-8 -*-
+"""
+Local on-demand render service.
+
+    python -m pdfgen.serve                   # http://127.0.0.1:8765
+    python -m pdfgen.serve --port 9000 --workers 2 --memory-mb 64 --disk-mb 512
+
+    GET /                       JSON index: documents, locales, versions, cache
+    GET /terms.pdf              the Terms of Use, both language versions
+    GET /terms.pdf?locale=fr    the French version only (LOCALES of the script)
+    GET /guide.pdf              the KR/FR guide
+
+so the Next.js app can link to (or proxy) http://127.0.0.1:8765/terms.pdf
+instead of a pre-built file.
+
+A response is keyed by (document, locale, content version). The content
+version is the build manifest's input hash (see pdfgen.manifest): it
+changes with the generator, the Markdown sources, the fonts and the
+rendering code, so a cached PDF is never stale. It is only recomputed
+when the (size, mtime) stamp of one of those files changes; a request
+costs a few stat() calls, not a re-read. Those calls, the script reloads
+and the hashing run on a single IO thread, never on the event loop.
+
+The ETag is derived from the key, so If-None-Match is answered with 304
+before any lookup; documents are rendered reproducibly (see
+BasePDF.reproducible), so a key always stands for the same bytes, in
+this process or after a restart. Cache-Control: no-cache makes clients
+revalidate every time. The bytes are kept in a bounded LRU in memory and
+a bounded LRU directory on disk (CACHE_DIR/render, see pdfgen) that
+survives restarts.
+
+A miss is rendered in a process pool, so layout never blocks the event
+loop. The workers are started with "spawn" and replaced when the inputs
+of a document change, so they never render with a stale script, font or
+pdfgen module.
+
+Renders go through a Scheduler, for predictable latency under bursts
+(everyone downloading the new Terms after a policy update):
+- requests for a key that is already queued or rendering wait for that
+  render instead of starting their own (single flight);
+- at most --workers renders run at once, the others wait in a priority
+  queue: interactive requests first, then batch ones
+  (?priority=batch or "X-Priority: batch", e.g. a cache warm-up script);
+- at most --max-queue renders wait: beyond that a request is rejected
+  at once with 503 and a Retry-After estimated from recent render times.
+  A batch request does not wait for its render at all: it is answered
+  202 Accepted and the document is in the cache once rendered.
+"""
+import argparse
+import asyncio
+import contextlib
+import hashlib
+import heapq
+import inspect
+import io
+import itertools
+import json
+import math
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from urllib.parse import parse_qs, urlsplit
+
+from . import CACHE_DIR, base, halves, layout, manifest
+from .build import JOBS, ROOT, load_script
+
+HOST = "127.0.0.1"
+PORT = 8765
+MEMORY_MB = 64
+DISK_MB = 512
+MAX_HEADER = 16 * 1024
+MAX_QUEUE = 16
+INTERACTIVE, BATCH = 0, 1  # render priorities, lowest first
+
+_JOBS = {j.name: j for j in JOBS}
+_REASONS = {200: "OK", 202: "Accepted", 304: "Not Modified", 400: "Bad Request",
+            404: "Not Found", 405: "Method Not Allowed", 500: "Internal Server Error",
+            503: "Service Unavailable"}
+
+
+def locales(job):
+    """Locales `job` can be rendered in on its own (besides all of them)."""
+    mod = load_script(job.script)
+    if "locale" not in inspect.signature(getattr(mod, job.func)).parameters:
+        return []
+    return list(getattr(mod, "LOCALES", ()))
+
+
+def render(name, locale=None):
+    """PDF bytes of document `name`, in one `locale` or all of them.
+    Runs in a pool worker."""
+    job = _JOBS[name]
+    base.BasePDF.dry_run = False
+    base.BasePDF.reproducible = True  # the bytes an ETag stands for
+    halves.parallel = False  # the pool is the parallelism; same bytes (see pdfgen.halves)
+    mod = load_script(job.script)
+    kwargs = {"locale": locale} if locale else {}
+    saved = getattr(mod, job.out)
+    with tempfile.TemporaryDirectory() as tmp:
+        setattr(mod, job.out, os.path.join(tmp, os.path.basename(saved)))
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                path = getattr(mod, job.func)(**kwargs)
+            with open(path, "rb") as f:
+                data = f.read()
+        finally:
+            setattr(mod, job.out, saved)
+    layout.save()
+    return data
+
+
+class MemoryLRU:
+    """Rendered bytes by key, the least recently used dropped beyond
+    `max_bytes`."""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._items = OrderedDict()
+
+    def get(self, key):
+        data = self._items.get(key)
+        if data is not None:
+            self._items.move_to_end(key)
+        return data
+
+    def put(self, key, data):
+        if len(data) > self.max_bytes:
+            return
+        old = self._items.pop(key, None)
+        if old is not None:
+            self.size -= len(old)
+        self._items[key] = data
+        self.size += len(data)
+        while self.size > self.max_bytes:
+            _, dropped = self._items.popitem(last=False)
+            self.size -= len(dropped)
+
+    def __len__(self):
+        return len(self._items)
+
+
+class DiskLRU:
+    """The same on disk: one file per key in `path`, recency kept in the
+    file mtimes so that it survives restarts."""
+
+    def __init__(self, path, max_bytes):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._items = OrderedDict()  # key -> size, least recent first
+        os.makedirs(path, exist_ok=True)
+        found = []
+        for entry in os.scandir(path):
+            if entry.name.endswith(".pdf") and entry.is_file():
+                st = entry.stat()
+                found.append((st.st_mtime_ns, entry.name[:-4], st.st_size))
+        for _, key, size in sorted(found):
+            self._items[key] = size
+            self.size += size
+        self._evict()
+
+    def _file(self, key):
+        return os.path.join(self.path, f"{key}.pdf")
+
+    def get(self, key):
+        if key not in self._items:
+            return None
+        try:
+            with open(self._file(key), "rb") as f:
+                data = f.read()
+            os.utime(self._file(key))
+        except OSError:
+            self.size -= self._items.pop(key)
+            return None
+        self._items.move_to_end(key)
+        return data
+
+    def put(self, key, data):
+        if len(data) > self.max_bytes:
+            return
+        tmp = f"{self._file(key)}.{os.getpid()}.tmp"
+        try:
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, self._file(key))
+        except OSError:
+            with contextlib.suppress(OSError):
+                os.remove(tmp)
+            return  # the disk cache is only an optimization
+        self.size -= self._items.pop(key, 0)
+        self._items[key] = len(data)
+        self.size += len(data)
+        self._evict()
+
+    def _evict(self):
+        while self.size > self.max_bytes and self._items:
+            key, size = self._items.popitem(last=False)
+            self.size -= size
+            with contextlib.suppress(OSError):
+                os.remove(self._file(key))
+
+    def __len__(self):
+        return len(self._items)
+
+
+class ResultCache:
+    """Memory LRU in front of an optional disk LRU."""
+
+    def __init__(self, memory_bytes, disk_path=None, disk_bytes=0):
+        self.memory = MemoryLRU(memory_bytes)
+        self.disk = DiskLRU(disk_path, disk_bytes) if disk_path and disk_bytes else None
+        self.hits = {"memory": 0, "disk": 0}
+        self.misses = 0
+
+    def get(self, key):
+        """(bytes, "memory" | "disk"), or (None, None)."""
+        data = self.memory.get(key)
+        if data is not None:
+            self.hits["memory"] += 1
+            return data, "memory"
+        data = self.disk.get(key) if self.disk is not None else None
+        if data is not None:
+            self.hits["disk"] += 1
+            self.memory.put(key, data)
+            return data, "disk"
+        self.misses += 1
+        return None, None
+
+    def put(self, key, data):
+        self.memory.put(key, data)
+        if self.disk is not None:
+            self.disk.put(key, data)
+
+    def stats(self):
+        out = {"hits": dict(self.hits), "misses": self.misses,
+               "memory": {"entries": len(self.memory), "bytes": self.memory.size}}
+        if self.disk is not None:
+            out["disk"] = {"entries": len(self.disk), "bytes": self.disk.size}
+        return out
+
+
+class _Flight:
+    """One render and everyone waiting for it."""
+
+    def __init__(self, key, job, locale, priority):
+        self.key = key
+        self.job = job
+        self.locale = locale
+        self.priority = priority
+        self.started = False
+        self.requests = 0
+        self.future = asyncio.get_running_loop().create_future()
+        # Nobody may be waiting (batch requests): do not log the error as lost
+        self.future.add_done_callback(lambda f: f.cancelled() or f.exception())
+
+
+class Scheduler:
+    """Runs the renders of a Service, one per key however many requests
+    want it, at most `workers` at a time, interactive before batch, with at
+    most `max_queue` waiting."""
+
+    def __init__(self, render, cache, workers=1, max_queue=MAX_QUEUE):
+        self.render = render  # async (job, locale) -> bytes
+        self.cache = cache
+        self.workers = workers
+        self.max_queue = max_queue
+        self.waiting = 0
+        self.running = 0
+        self.coalesced = 0
+        self.rejected = 0
+        self.seconds = None  # moving average of the render time
+        self._flights = {}  # key -> _Flight, queued or running
+        self._heap = []     # (priority, seq, _Flight); stale entries are skipped
+        self._seq = itertools.count()
+        self._ready = None
+
+    def submit(self, key, job, locale, priority=INTERACTIVE):
+        """The _Flight rendering `key` (an existing one if any), or None
+        when the queue is full."""
+        flight = self._flights.get(key)
+        if flight is not None:
+            self.coalesced += 1
+            flight.requests += 1
+            if priority < flight.priority and not flight.started:
+                flight.priority = priority
+                self._push(flight)
+            return flight
+        # Flights a free worker is about to pick up are not queued
+        if self.waiting - max(0, self.workers - self.running) >= self.max_queue:
+            self.rejected += 1
+            return None
+        flight = self._flights[key] = _Flight(key, job, locale, priority)
+        flight.requests = 1
+        self.waiting += 1
+        self._push(flight)
+        return flight
+
+    def retry_after(self):
+        """Seconds until a slot is likely to be free."""
+        per_render = self.seconds or 1.0
+        return max(1, math.ceil(per_render * (self.waiting / self.workers + 1)))
+
+    def start(self):
+        """Start the runners (inside the event loop)."""
+        self._ready = asyncio.Condition()
+        return [asyncio.ensure_future(self._runner()) for _ in range(self.workers)]
+
+    def stats(self):
+        return {"running": self.running, "waiting": self.waiting, "coalesced": self.coalesced,
+                "rejected": self.rejected, "render_seconds": self.seconds}
+
+    def _push(self, flight):
+        heapq.heappush(self._heap, (flight.priority, next(self._seq), flight))
+        if self._ready is not None:
+            asyncio.ensure_future(self._notify())
+
+    async def _notify(self):
+        async with self._ready:
+            self._ready.notify()
+
+    async def _next(self):
+        async with self._ready:
+            while True:
+                while self._heap:
+                    priority, _, flight = heapq.heappop(self._heap)
+                    if not flight.started and priority == flight.priority:
+                        return flight
+                await self._ready.wait()
+
+    async def _runner(self):
+        while True:
+            flight = await self._next()
+            flight.started = True
+            self.waiting -= 1
+            self.running += 1
+            t0 = time.perf_counter()
+            try:
+                data = await self.render(flight.job, flight.locale)
+            except Exception as e:
+                flight.future.set_exception(e)
+            else:
+                self.cache.put(flight.key, data)
+                flight.future.set_result(data)
+                seconds = time.perf_counter() - t0
+                self.seconds = seconds if self.seconds is None else 0.8 * self.seconds + 0.2 * seconds
+            finally:
+                self.running -= 1
+                del self._flights[flight.key]
+
+
+class Service:
+    """The HTTP front end, the content versions and the render pool."""
+
+    def __init__(self, cache, workers=1, max_queue=MAX_QUEUE):
+        self.cache = cache
+        self.workers = workers
+        self.scheduler = Scheduler(self.render, cache, workers, max_queue)
+        self.pool = None
+        self._pool_inputs = None  # stamp of every input when the pool started
+        self._versions = {}  # job name -> (input stamp, (input hash, locales, file stem))
+        self._scripts = {}   # script -> stamp of the file when it was loaded
+        # One thread: the version state and the script reloads are not shared
+        self._io = ThreadPoolExecutor(max_workers=1, thread_name_prefix="versions")
+
+    # --- content versions --------------------------------------------------
+
+    def _reload(self, job):
+        """The script module, imported again if the file changed."""
+        st = manifest.stamp([os.path.join(ROOT, job.script)])
+        changed = self._scripts.get(job.script, st) != st
+        self._scripts[job.script] = st
+        return load_script(job.script, reload=changed)
+
+    def _describe(self, job):
+        """((input hash, locales, file stem) of `job`, whether the workers
+        hold code older than the inputs). Runs on the IO thread; the hash
+        is recomputed only when an input file changed."""
+        mod = self._reload(job)
+        st = manifest.stamp(manifest.input_files(mod, job.func))
+        known = self._versions.get(job.name)
+        if known and known[0] == st:
+            return known[1], False
+        stale = self._pool_inputs is not None and self._inputs() != self._pool_inputs
+        stem = os.path.splitext(os.path.basename(getattr(mod, job.out)))[0]
+        info = (manifest.input_hash(mod, job.func, reproducible=True), locales(job), stem)
+        self._versions[job.name] = (st, info)
+        return info, stale
+
+    async def describe(self, job):
+        """(input hash, locales, file stem) of `job`; a change of its inputs
+        also replaces the workers, which may hold the old code."""
+        loop = asyncio.get_running_loop()
+        info, stale = await loop.run_in_executor(self._io, self._describe, job)
+        if stale:
+            self._restart_pool()
+        return info
+
+    @staticmethod
+    def etag(job, locale, version):
+        key = f"{job.name}\0{locale or ''}\0{version}"
+        return hashlib.sha256(key.encode()).hexdigest()[:32]
+
+    # --- rendering ----------------------------------------------------------
+
+    def _inputs(self):
+        files = set()
+        for job in JOBS:
+            files.update(manifest.input_files(load_script(job.script), job.func))
+        return manifest.stamp(sorted(files))
+
+    def _restart_pool(self):
+        if self.pool is not None:
+            self.pool.shutdown(wait=False)
+            self.pool = None
+            self._pool_inputs = None
+
+    async def render(self, job, locale):
+        loop = asyncio.get_running_loop()
+        if self.pool is None:
+            # Set before the await, so concurrent renders share the pool
+            self.pool = pool = ProcessPoolExecutor(max_workers=self.workers,
+                                                   mp_context=multiprocessing.get_context("spawn"))
+            inputs = await loop.run_in_executor(self._io, self._inputs)
+            if self.pool is pool:
+                self._pool_inputs = inputs
+        try:
+            return await loop.run_in_executor(self.pool, render, job.name, locale)
+        except BrokenProcessPool:
+            self._restart_pool()
+            raise
+
+    # --- HTTP ---------------------------------------------------------------
+
+    async def index(self):
+        docs = {}
+        for job in JOBS:
+            version, locs, _ = await self.describe(job)
+            docs[job.name] = {"path": f"/{job.name}.pdf", "locales": locs, "version": version}
+        return {"documents": docs, "cache": self.cache.stats(), "renders": self.scheduler.stats()}
+
+    async def respond(self, method, target, headers):
+        """(status, headers, body) of one request."""
+        if method not in ("GET", "HEAD"):
+            return 405, {"Allow": "GET, HEAD"}, b""
+        url = urlsplit(target)
+        if url.path == "/":
+            return 200, {"Content-Type": "application/json"}, json.dumps(await self.index()).encode()
+        name, ext = os.path.splitext(url.path.lstrip("/"))
+        job = _JOBS.get(name) if ext == ".pdf" else None
+        if job is None:
+            return 404, {}, f"No document {url.path}; see / for the list.\n".encode()
+        version, locs, stem = await self.describe(job)
+        locale = parse_qs(url.query).get("locale", [""])[0] or None
+        if locale is not None and locale not in locs:
+            found = ", ".join(locs) or "none"
+            return 404, {}, f"No {locale!r} version of {name} (locales: {found}).\n".encode()
+        etag = f'"{self.etag(job, locale, version)}"'
+        common = {"ETag": etag, "Cache-Control": "no-cache"}
+        wanted = headers.get("if-none-match", "")
+        if wanted.strip() == "*" or etag in [t.strip().removeprefix("W/") for t in wanted.split(",")]:
+            return 304, common, b""
+        data, source = self.cache.get(etag.strip('"'))
+        if data is None:
+            query = parse_qs(url.query).get("priority", [""])[0] or headers.get("x-priority", "")
+            priority = BATCH if query.lower() == "batch" else INTERACTIVE
+            flight = self.scheduler.submit(etag.strip('"'), job, locale, priority)
+            if flight is None:
+                return 503, {"Retry-After": str(self.scheduler.retry_after())}, \
+                    b"Too many documents waiting to be rendered; retry later.\n"
+            first = flight.requests == 1
+            if priority == BATCH:
+                return 202, {**common, "Location": target}, b"Queued for rendering.\n"
+            try:
+                data = await asyncio.shield(flight.future)
+            except Exception as e:
+                return 500, {}, f"Rendering {name} failed: {type(e).__name__}: {e}\n".encode()
+            source = "render" if first else "coalesced"
+        filename = f"{stem}-{locale}.pdf" if locale else f"{stem}.pdf"
+        return 200, {**common, "Content-Type": "application/pdf", "X-Cache": source,
+                     "Content-Disposition": f'inline; filename="{filename}"'}, data
+
+    async def handle(self, reader, writer):
+        """Serve the requests of one (keep-alive) connection."""
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    return
+                t0 = time.perf_counter()
+                lines = head.decode("latin-1").split("\r\n")
+                request = lines[0].split()
+                headers = {}
+                for line in lines[1:]:
+                    name, sep, value = line.partition(":")
+                    if sep:
+                        headers[name.strip().lower()] = value.strip()
+                if len(request) != 3:
+                    status, extra, body = 400, {}, b"Malformed request line.\n"
+                    method, target, version = "?", "?", "HTTP/1.0"
+                else:
+                    method, target, version = request
+                    length = headers.get("content-length", "0").strip()
+                    if not length.isdigit():
+                        status, extra, body = 400, {}, b"Malformed Content-Length.\n"
+                    else:
+                        if int(length):
+                            try:
+                                await reader.readexactly(int(length))
+                            except (asyncio.IncompleteReadError, ConnectionError):
+                                return
+                        try:
+                            status, extra, body = await self.respond(method, target, headers)
+                        except Exception as e:  # e.g. a script that no longer imports
+                            status, extra, body = 500, {}, f"{type(e).__name__}: {e}\n".encode()
+                keep = (version == "HTTP/1.1" and status != 400
+                        and headers.get("connection", "").lower() != "close")
+                out = [f"HTTP/1.1 {status} {_REASONS[status]}", f"Content-Length: {len(body)}",
+                       "Connection: " + ("keep-alive" if keep else "close")]
+                out += [f"{k}: {v}" for k, v in extra.items()]
+                if status != 200 and "Content-Type" not in extra and body:
+                    out.append("Content-Type: text/plain; charset=utf-8")
+                writer.write(("\r\n".join(out) + "\r\n\r\n").encode("latin-1"))
+                if method != "HEAD" and status != 304:
+                    writer.write(body)
+                await writer.drain()
+                print(f"{method} {target} {status} {extra.get('X-Cache', '-')} "
+                      f"{(time.perf_counter() - t0) * 1000:.2f}ms", flush=True)
+                if not keep:
+                    return
+        finally:
+            writer.close()
+
+    async def serve(self, host=HOST, port=PORT):
+        runners = self.scheduler.start()
+        server = await asyncio.start_server(self.handle, host, port, limit=MAX_HEADER)
+        print(f"Serving the Bazary PDF documents on http://{host}:{port}/", flush=True)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            for task in runners:
+                task.cancel()
+            self._restart_pool()
+            self._io.shutdown(wait=False)
+
+
+def parse_args(argv=None):
+    p = argparse.ArgumentParser(description="Render the Bazary PDF documents on demand over HTTP.")
+    p.add_argument("--host", default=HOST, help=f"address to listen on (default {HOST})")
+    p.add_argument("--port", type=int, default=PORT, help=f"port (default {PORT})")
+    p.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                   help="render worker processes (default: CPU count)")
+    p.add_argument("--max-queue", type=int, default=MAX_QUEUE,
+                   help=f"renders allowed to wait for a worker before requests are "
+                        f"rejected with 503 (default {MAX_QUEUE})")
+    p.add_argument("--memory-mb", type=float, default=MEMORY_MB,
+                   help=f"in-memory cache size (default {MEMORY_MB})")
+    p.add_argument("--disk-mb", type=float, default=DISK_MB,
+                   help=f"on-disk cache size, 0 to disable (default {DISK_MB})")
+    p.add_argument("--cache-dir", default=CACHE_DIR and os.path.join(CACHE_DIR, "render"),
+                   help="on-disk cache directory (default: CACHE_DIR/render)")
+    return p.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    cache = ResultCache(int(args.memory_mb * 2**20), args.cache_dir, int(args.disk_mb * 2**20))
+    service = Service(cache, workers=max(1, args.workers), max_queue=max(0, args.max_queue))
+    with contextlib.suppress(KeyboardInterrupt):
+        asyncio.run(service.serve(args.host, args.port))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+"""
+Page spool for very large documents.
+
+In spool mode (BasePDF.spool) a page's content stream leaves memory as
+soon as the next page begins: it is appended to a temporary file and
+the page keeps a SpooledContents handle in its place. The pages held by
+a table of contents placeholder stay in memory, since the TOC is drawn
+onto them at output.
+
+At output the {nb} substitutions fpdf applies to every page are recorded
+on the handles and applied when each page is read back. The compressed
+stream goes back into the spool as a SpooledStream. The file itself is
+written straight to its destination through a FileBuffer, with the xref
+offsets and /ID computed as it goes. At no point is more than one page
+stream in memory.
+"""
+import hashlib
+import tempfile
+import zlib
+
+from fpdf.syntax import Name, PDFContentStream
+
+
+class Spool:
+    """Append-only temporary file of page streams."""
+
+    def __init__(self):
+        self.file = tempfile.TemporaryFile(prefix="bazary-spool-")
+        self.size = 0
+
+    def write(self, data):
+        self.file.seek(self.size)
+        self.file.write(data)
+        offset = self.size
+        self.size += len(data)
+        return offset, len(data)
+
+    def read(self, offset, length):
+        self.file.seek(offset)
+        return self.file.read(length)
+
+    def close(self):
+        self.file.close()
+
+
+class SpooledContents:
+    """Stands in for the contents bytearray of a spooled page."""
+
+    __slots__ = ("spool", "offset", "length", "substitutions")
+
+    def __init__(self, spool, data):
+        self.spool = spool
+        self.offset, self.length = spool.write(data)
+        self.substitutions = []
+
+    def replace(self, old, new):
+        # fpdf's {nb} fix-up: page.contents = page.contents.replace(...)
+        self.substitutions.append((old, new))
+        return self
+
+    def load(self):
+        data = self.spool.read(self.offset, self.length)
+        for old, new in self.substitutions:
+            data = data.replace(old, new)
+        return bytearray(data)
+
+
+class SpooledStream(PDFContentStream):
+    """A page content stream, compressed into the spool, read back only
+    when it is written out."""
+
+    def __init__(self, spool, contents, compress):
+        super().__init__(contents=b"", compress=False)
+        if compress:
+            contents = zlib.compress(contents, level=self._COMPRESSION_LEVEL)
+            self.filter = Name("FlateDecode")
+        self._spool = spool
+        self._contents = None
+        self._where = spool.write(contents)
+        self.length = self._where[1]
+
+    def content_stream(self):
+        return self._spool.read(*self._where)
+
+
+class FileBuffer:
+    """Write-through stand-in for OutputProducer.buffer: fpdf only appends
+    to it and takes its length (object offsets, startxref)."""
+
+    def __init__(self, file):
+        self.file = file
+        self.md5 = hashlib.new("md5", usedforsecurity=False)
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def __iadd__(self, data):
+        self.file.write(data)
+        self.md5.update(data)
+        self.size += len(data)
+        return self
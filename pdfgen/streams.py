@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+"""
+Redundant graphics-state elimination for page content streams.
+
+fpdf already skips set_font / set_draw_color / set_line_width calls that
+do not change anything. What is left is how it colours text: every line
+drawn in a colour other than the fill colour becomes its own
+
+    q BT x y Td r g b rg (...) Tj ET Q
+
+so a paragraph of N lines saves and restores the graphics state N times
+and sets the same colour N times. Adjacent groups of that shape are
+merged into one q ... Q, and a colour that is already in effect inside
+the merged group is dropped:
+
+    q BT x1 y1 Td c rg (...) Tj ET
+    BT x2 y2 Td (...) Tj ET Q
+
+Only groups that change nothing but the fill colour are touched (no
+font, spacing, rise or rendering-mode operators), so the state after
+the final Q is exactly what it was before. The rendered page is
+identical. The stream is tokenized rather than split into lines: the
+glyph ids in TrueType strings can contain newline bytes.
+"""
+import re
+
+removed = 0  # operators removed in this process, see stats()
+
+# One lexical token of a content stream. Strings come first so that glyph
+# ids which happen to look like operators or newlines are skipped whole.
+_TOKEN = re.compile(rb"""
+    (?P<operand> \((?:\\.|[^\\)])*\)        # literal string (fpdf escapes \ ( ))
+               | <[0-9A-Fa-f\s]*>         # hex string
+               | /[^\s/\[\]()<>]+         # name
+               | [-+]?(?:\d+\.?\d*|\.\d+)  # number
+               | [\[\]] )
+  | (?P<op> [A-Za-z*'"]+ )
+  | (?P<space> \s+ )
+  | (?P<other> . )
+""", re.S | re.X)
+
+# Operators allowed inside a group that is merged with its neighbours:
+# nothing that changes state other than the fill colour (TD and T* are
+# left out too: they set / use the leading, which outlives ET).
+_TEXT_ONLY = {"BT", "ET", "Td", "Tm", "rg", "g", "Tj", "TJ"}
+_COLOUR = {"rg", "g"}
+
+
+def _statements(data):
+    """[(operator, operands, start, end)] - `start` is where the operands
+    begin. Anything unparsable becomes an operator of its own (None)."""
+    out = []
+    start = None
+    for m in _TOKEN.finditer(data):
+        kind = m.lastgroup
+        if kind == "space":
+            continue
+        if start is None:
+            start = m.start()
+        if kind == "operand":
+            continue
+        op = m.group().decode("latin-1") if kind == "op" else None
+        out.append((op, data[start:m.start()].strip(), start, m.end()))
+        start = None
+    return out
+
+
+def _group(stmts, i):
+    """End index (the Q) of a `q BT Td <colour> ... ET Q` group starting
+    at i that only sets the fill colour and shows text, else None."""
+    head = [s[0] for s in stmts[i:i + 4]]
+    if len(head) < 4 or head[:3] != ["q", "BT", "Td"] or head[3] not in _COLOUR:
+        return None
+    for j in range(i + 4, len(stmts) - 1):
+        op = stmts[j][0]
+        if op == "ET" and stmts[j + 1][0] == "Q":
+            return j + 1
+        if op not in _TEXT_ONLY:
+            return None
+    return None
+
+
+def eliminate(contents):
+    """Return (optimized content stream, number of operators removed)."""
+    global removed
+    data = bytes(contents)
+    stmts = _statements(data)
+    edits = []  # (start, end, replacement), in order
+    count = 0
+    i = 0
+    prev = None  # (index of the Q, fill colour at its ET) of the previous group
+    while i < len(stmts):
+        end = _group(stmts, i)
+        if end is None:
+            prev = None
+            i += 1
+            continue
+        if prev is not None and prev[0] == i - 1:
+            # Adjacent to the previous group: drop its "Q" and our "q"
+            edits.append((stmts[i - 2][3], stmts[i + 1][2], b"\n"))
+            count += 2
+            colour = stmts[i + 3]
+            if (colour[0], colour[1]) == prev[1]:
+                edits.append((colour[2], stmts[i + 4][2], b""))
+                count += 1
+        last = [s for s in stmts[i:end] if s[0] in _COLOUR][-1]
+        prev = (end, (last[0], last[1]))
+        i = end + 1
+    if not edits:
+        return contents, 0
+    out = bytearray()
+    pos = 0
+    for start, stop, repl in edits:
+        out += data[pos:start]
+        out += repl
+        pos = stop
+    out += data[pos:]
+    removed += count
+    return out, count
+
+
+def stats():
+    return {"removed": removed}
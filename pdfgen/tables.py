@@ -0,0 +1,247 @@
+# -*- coding: utf-8 -*-
+"""
+Table engine for LegalDoc.table() and PDF.table() / PDF.trow().
+
+Rows may be any iterable, generator included; they are read CHUNK at a
+time and each chunk is measured before any of it is drawn:
+
+- every distinct word of the chunk is measured in one pass per font, so
+  a column of repeated values costs one measurement, not one per row;
+- with the first chunk, each column gets a natural width (its longest
+  unwrapped cell) and a minimum width (its longest word), and the columns
+  are fitted to the table width from those (autofit); explicit
+  col_widths skip this. The widths then hold for the whole table;
+- every cell is wrapped into lines from the same word widths, which
+  gives the row heights.
+
+Drawing then only places the precomputed lines. A row that does not fit
+on the page starts a new one and the header row is drawn again above it.
+Only one chunk of rows (and its words) is held at a time, so a table of
+any length lays out in constant memory.
+"""
+import itertools
+from dataclasses import dataclass
+
+CHUNK = 500  # rows measured and drawn together
+
+
+@dataclass
+class TableStyle:
+    """Fonts (family, style, size), colours and line heights of a table."""
+    header_font: tuple
+    body_font: tuple
+    header_fill: tuple
+    header_text: tuple
+    header_border: tuple
+    fills: tuple          # body fills, alternating by row
+    body_text: tuple
+    body_border: tuple
+    header_line: float = 7
+    body_line: float = 6.5
+    header_align: str = "C"
+    body_align: str = "L"
+
+
+class _Measure:
+    """Word widths in one font, each distinct word measured once."""
+
+    def __init__(self, pdf, font):
+        self.pdf = pdf
+        self.font = font
+        self.widths = {}
+
+    def batch(self, texts):
+        pdf = self.pdf
+        pdf.set_font(*self.font)
+        for text in texts:
+            for word in text.split():
+                if word not in self.widths:
+                    self.widths[word] = pdf.get_string_width(word)
+        if " " not in self.widths:
+            self.widths[" "] = pdf.get_string_width(" ")
+
+    def natural(self, text):
+        """Width of the widest line of `text` left unwrapped."""
+        space = self.widths[" "]
+        return max((sum(self.widths[w] for w in line.split()) + space * max(len(line.split()) - 1, 0)
+                    for line in text.split("\n")), default=0)
+
+    def longest_word(self, text):
+        return max((self.widths[w] for w in text.split()), default=0)
+
+    def wrap(self, text, width):
+        """Greedy word wrap of `text` into lines at most `width` wide;
+        words wider than a line are broken between characters."""
+        space = self.widths[" "]
+        lines = []
+        for para in text.split("\n"):
+            line, used = [], 0
+            for word in para.split():
+                w = self.widths[word]
+                if line and used + space + w <= width:
+                    line.append(word)
+                    used += space + w
+                    continue
+                if line:
+                    lines.append(" ".join(line))
+                if w > width:
+                    pieces = self._break_word(word, width)
+                    lines.extend(pieces[:-1])
+                    word = pieces[-1]
+                    w = self.pdf.get_string_width(word)
+                line, used = [word], w
+            lines.append(" ".join(line))
+        return lines
+
+    def _break_word(self, word, width):
+        self.pdf.set_font(*self.font)
+        pieces, piece = [], ""
+        for ch in word:
+            if piece and self.pdf.get_string_width(piece + ch) > width:
+                pieces.append(piece)
+                piece = ""
+            piece += ch
+        pieces.append(piece)
+        return pieces
+
+
+def autofit(natural, minimum, total):
+    """Column widths summing to `total` from each column's natural and
+    minimum width: columns narrower than an even share keep their natural
+    width, the others get their minimum plus the room left, shared in
+    proportion to how much they would still grow."""
+    n = len(natural)
+    if sum(natural) <= total:
+        nat = sum(natural)
+        return [total * w / nat for w in natural] if nat else [total / n] * n
+    widths = {}
+    while True:
+        rest = [i for i in range(n) if i not in widths]
+        share = (total - sum(widths.values())) / len(rest)
+        narrow = [i for i in rest if natural[i] <= share]
+        if not narrow:
+            break
+        widths.update((i, natural[i]) for i in narrow)
+    room = total - sum(widths.values())
+    low = sum(minimum[i] for i in rest)
+    if low >= room:
+        widths.update((i, room * minimum[i] / low) for i in rest)
+    else:
+        slack = sum(natural[i] - minimum[i] for i in rest)
+        widths.update((i, minimum[i] + (room - low) * (natural[i] - minimum[i]) / slack) for i in rest)
+    return [widths[i] for i in range(n)]
+
+
+class Table:
+    """A table being laid out from the current position."""
+
+    def __init__(self, pdf, headers, style, width, col_widths=None):
+        self.pdf = pdf
+        self.style = style
+        self.width = width
+        self.headers = [str(h) for h in headers] if headers else None
+        self.widths = list(col_widths) if col_widths else None
+        self.columns = len(self.widths or self.headers or [])
+        self.pad = 2 * pdf.c_margin
+        self.head = _Measure(pdf, style.header_font)
+        self.body = _Measure(pdf, style.body_font)
+        if self.headers:
+            self.head.batch(self.headers)
+        self.header_lines = None
+        self.drawn = 0  # body rows drawn so far, for the alternating fills
+
+    def draw(self, rows, chunk=CHUNK):
+        """Lay out `rows` (any iterable) below the header, CHUNK at a time."""
+        rows = iter(rows)
+        first = True
+        while True:
+            block = [[str(c) for c in row] for row in itertools.islice(rows, chunk)]
+            if first:
+                self.columns = self.columns or max((len(r) for r in block), default=0)
+                if not self.columns:
+                    return
+            block = [row[:self.columns] + [""] * (self.columns - len(row)) for row in block]
+            self.body.widths.clear()  # only this chunk's words are kept
+            self.body.batch(c for row in block for c in row)
+            if first:
+                self._fit(block)
+            lines = [[self.body.wrap(c, w - self.pad) for c, w in zip(row, self.widths)]
+                     for row in block]
+            del block
+            if first:
+                self._start(lines[0] if lines else None)
+                first = False
+            for cells in lines:
+                self._body_row(cells)
+            if len(lines) < chunk:
+                break
+
+    def _fit(self, block):
+        """Fix the column widths from the header and the first chunk."""
+        n = self.columns
+        if self.widths is None:
+            natural, minimum = [0] * n, [0] * n
+            measured = [(self.headers, self.head)] if self.headers else []
+            for row, m in measured + [(row, self.body) for row in block]:
+                for i, c in enumerate(row):
+                    natural[i] = max(natural[i], m.natural(c) + self.pad)
+                    minimum[i] = max(minimum[i], m.longest_word(c) + self.pad)
+            self.widths = autofit(natural, minimum, self.width)
+        if self.headers:
+            self.header_lines = [self.head.wrap(c, w - self.pad) for c, w in zip(self.headers, self.widths)]
+
+    def _start(self, first):
+        """Keep the header with the first row."""
+        s = self.style
+        needed = self._height(self.header_lines, s.header_line) if self.headers else 0
+        if first:
+            needed += self._height(first, s.body_line)
+        if needed and self.pdf.will_page_break(needed):
+            self.pdf.add_page(same=True)
+        self._draw_header()
+
+    def _body_row(self, cells):
+        s = self.style
+        if self.pdf.will_page_break(self._height(cells, s.body_line)):
+            self.pdf.add_page(same=True)
+            self._draw_header()
+        self._draw_row(cells, s.body_font, s.fills[self.drawn % len(s.fills)], s.body_text,
+                       s.body_border, s.body_line, s.body_align)
+        self.drawn += 1
+
+    def _draw_header(self):
+        s = self.style
+        if self.headers:
+            self._draw_row(self.header_lines, s.header_font, s.header_fill, s.header_text,
+                           s.header_border, s.header_line, s.header_align)
+
+    @staticmethod
+    def _height(lines, line_h):
+        return max((len(cell) for cell in lines), default=1) * line_h
+
+    def _draw_row(self, lines, font, fill, text, border, line_h, align):
+        pdf = self.pdf
+        pdf.set_font(*font)
+        pdf.set_fill_color(*fill)
+        pdf.set_text_color(*text)
+        pdf.set_draw_color(*border)
+        h = self._height(lines, line_h)
+        x, y = pdf.l_margin, pdf.y
+        for w, cell in zip(self.widths, lines):
+            pdf.set_xy(x, y)
+            if h == line_h:
+                pdf.cell(w, h, cell[0], border=1, fill=True, align=align)
+            else:  # wrapped row: the cells' lines are top-aligned
+                pdf.cell(w, h, "", border=1, fill=True)
+                for i, line in enumerate(cell):
+                    pdf.set_xy(x, y + i * line_h)
+                    pdf.cell(w, line_h, line, align=align)
+            x += w
+        pdf.set_xy(pdf.l_margin, y + h)
+
+
+def draw(pdf, headers, rows, style, width, col_widths=None):
+    """Lay out a table from an iterable of rows; returns the column widths used."""
+    table = Table(pdf, headers, style, width, col_widths)
+    table.draw(rows)
+    return table.widths
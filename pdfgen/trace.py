@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+"""
+Opt-in tracing of document builds, exported as Chrome trace-event JSON.
+
+    python generate-legal-pdfs.py --all --trace build-trace.json
+
+then open the file in chrome://tracing or https://ui.perfetto.dev.
+
+instrument() wraps, on a document class (LegalDoc, PDF):
+- every public method it or BasePDF defines (the primitives: body,
+  table, kr, h1, ..., plus add_font, multi_cell, static, output),
+- add_page, cell, header and footer,
+and the output phases of pdfgen.output.Producer (bufferize, pages,
+fonts). Each call becomes a complete ("X") event named after the method,
+with the document ref (LegalDoc.doc_ref, else the class name) and the
+page it started on. Nested calls nest in the flame view; with a process
+pool every worker is its own pid.
+
+Nothing is wrapped unless instrument() is called, so untraced builds pay
+nothing.
+"""
+import functools
+import json
+import os
+import threading
+import time
+
+from .base import BasePDF
+from .output import Producer
+
+# FPDF methods worth a span besides the document's own
+FPDF_METHODS = ["add_page", "cell", "header", "footer"]
+PRODUCER_METHODS = {"bufferize": "output.bufferize", "_add_pages": "output.pages",
+                    "_add_fonts": "output.fonts"}
+
+events = []
+
+
+def _doc_ref(pdf):
+    return getattr(pdf, "doc_ref", None) or type(pdf).__name__
+
+
+def _wrap(func, name, pdf_of):
+    if getattr(func, "_traced", False):
+        return func
+
+    @functools.wraps(func)
+    def traced(self, *args, **kwargs):
+        pdf = pdf_of(self)
+        page = pdf.page
+        start = time.perf_counter_ns()
+        try:
+            return func(self, *args, **kwargs)
+        finally:
+            end = time.perf_counter_ns()
+            span = {"name": name, "cat": type(pdf).__name__, "ph": "X",
+                    "ts": start / 1000, "dur": (end - start) / 1000,
+                    "pid": os.getpid(), "tid": threading.get_native_id(),
+                    "args": {"doc": _doc_ref(pdf), "page": page}}
+            if pdf.page != page:
+                span["args"]["end_page"] = pdf.page
+            events.append(span)
+    traced._traced = True
+    return traced
+
+
+def instrument(cls):
+    """Wrap the primitives, page and output methods of document class `cls`."""
+    names = set(FPDF_METHODS)
+    for klass in cls.__mro__:
+        if issubclass(klass, BasePDF):
+            names.update(n for n, v in vars(klass).items()
+                         if callable(v) and not n.startswith("_"))
+    for name in sorted(names):
+        setattr(cls, name, _wrap(getattr(cls, name), name, lambda pdf: pdf))
+    for method, name in PRODUCER_METHODS.items():
+        setattr(Producer, method, _wrap(getattr(Producer, method), name, lambda p: p.fpdf))
+
+
+def instrument_module(mod):
+    """instrument() every document class of a generator script."""
+    for obj in list(vars(mod).values()):
+        if isinstance(obj, type) and issubclass(obj, BasePDF) and obj is not BasePDF:
+            instrument(obj)
+
+
+def label(name):
+    """Name the current process and thread in the trace (e.g. the job)."""
+    pid, tid = os.getpid(), threading.get_native_id()
+    events.append({"name": "process_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}})
+    events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}})
+
+
+def take():
+    """Return and clear the events recorded in this process."""
+    taken = events[:]
+    del events[:]
+    return taken
+
+
+def save(path, trace_events):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"traceEvents": trace_events, "displayTimeUnit": "ms"}, f)
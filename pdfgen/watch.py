@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""
+Watch mode (--watch): rebuild the documents whose sources change.
+
+    python generate-legal-pdfs.py --watch          # review, terms, privacy
+    python generate-legal-pdfs.py --watch terms    # only the Terms of Use
+
+Every POLL seconds the (size, mtime) stamps of the inputs of the watched
+documents are compared (see manifest.input_files(): the generator
+scripts, the Markdown sources, the fonts and the pdfgen modules). A
+change opens a DEBOUNCE window that every further change extends, so an
+editor saving several files, or writing one in several steps, triggers
+one build.
+
+Builds run in the watching process: the fonts (see pdfgen.fonts) and the
+line-breaking cache (see pdfgen.layout) stay warm from one build to the
+next, and an edited paragraph is the only text measured again. A changed
+script is imported again, then only the documents using a changed file
+whose input hash differs from the manifest are rebuilt: editing the
+Privacy Policy Markdown, or gen_terms(), rebuilds one document. A change
+to pdfgen itself or to a font cannot be taken into the running process
+(imported modules, parsed fonts): the watcher restarts.
+"""
+import os
+import sys
+import time
+import traceback
+
+from . import manifest
+
+POLL = 0.1      # seconds between two looks at the stamps
+DEBOUNCE = 0.2  # quiet time after the last change before building
+
+
+def _inputs(jobs):
+    """{job name: [input files]} and the scripts they come from."""
+    from .build import load_script  # build imports this module
+    files, scripts = {}, {}
+    for job in jobs:
+        mod = load_script(job.script)
+        files[job.name] = manifest.input_files(mod, job.func)
+        scripts[os.path.abspath(mod.__file__)] = job.script
+    return files, scripts
+
+
+def _stamps(paths):
+    return dict(zip(paths, manifest.stamp(paths)))
+
+
+def _changes(stamps):
+    """The files of `stamps` that changed since, updating it."""
+    now = _stamps(list(stamps))
+    changed = {p for p, st in now.items() if stamps[p] != st}
+    stamps.update(now)
+    return changed
+
+
+def _restart(names):
+    print(f"\nChanged: {names} - restarting the watcher...\n", flush=True)
+    os.execv(sys.executable, [sys.executable] + sys.argv)
+
+
+def watch(jobs, build, poll=POLL, debounce=DEBOUNCE):
+    """Call build(jobs affected) after each burst of changes to the inputs
+    of `jobs`, until interrupted. Returns the exit status."""
+    from .build import load_script
+    files, scripts = _inputs(jobs)
+    stamps = _stamps(sorted({p for paths in files.values() for p in paths}))
+    try:
+        while True:
+            print(f"\nWatching {len(stamps)} files for changes (Ctrl-C to stop)...", flush=True)
+            changed = set()
+            while not changed:
+                time.sleep(poll)
+                changed = _changes(stamps)
+            quiet_since = time.monotonic()
+            while time.monotonic() - quiet_since < debounce:
+                time.sleep(poll)
+                more = _changes(stamps)
+                if more:
+                    changed |= more
+                    quiet_since = time.monotonic()
+            names = ", ".join(sorted(os.path.basename(p) for p in changed))
+            if any(os.path.abspath(p) not in scripts and not p.endswith(".md") for p in changed):
+                _restart(names)
+            print(f"\nChanged: {names}\n", flush=True)
+            try:
+                for path in changed:
+                    if os.path.abspath(path) in scripts:
+                        load_script(scripts[os.path.abspath(path)], reload=True)
+                build([j for j in jobs if changed & set(files[j.name])])
+                # The script may now render other Markdown files or fonts
+                files, scripts = _inputs(jobs)
+                stamps.update({p: st for p, st in _stamps(
+                    sorted({p for paths in files.values() for p in paths})).items()
+                    if p not in stamps})
+            except Exception:
+                traceback.print_exc()
+    except KeyboardInterrupt:
+        return 0